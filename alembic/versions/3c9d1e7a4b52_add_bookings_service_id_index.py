@@ -0,0 +1,36 @@
+"""add bookings service_id index
+
+Revision ID: 3c9d1e7a4b52
+Revises: f8cc258e8cc0
+Create Date: 2026-10-18 14:21:07.552913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d1e7a4b52'
+down_revision: Union[str, Sequence[str], None] = 'f8cc258e8cc0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ix_bookings_service_active_window only covers pending/confirmed rows,
+    # while reviews belong to completed bookings. CREATE INDEX CONCURRENTLY
+    # cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bookings_service_id', 'bookings', ['service_id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_bookings_service_id', table_name='bookings', postgresql_concurrently=True)
@@ -0,0 +1,49 @@
+"""add users token_version
+
+Revision ID: 5a0e6c2f9d13
+Revises: 3c9d1e7a4b52
+Create Date: 2026-10-18 15:02:44.118093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a0e6c2f9d13'
+down_revision: Union[str, Sequence[str], None] = '3c9d1e7a4b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users',
+        sa.Column('token_version', sa.Integer(), server_default='0', nullable=False)
+    )
+
+    # Tokens carry the role as a claim: any role change, including a plain
+    # UPDATE from psql or pgAdmin, retires the user's tokens
+    op.execute("""
+        CREATE OR REPLACE FUNCTION users_bump_token_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.token_version := OLD.token_version + 1;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_users_role_token_version
+        BEFORE UPDATE OF role ON users
+        FOR EACH ROW WHEN (OLD.role IS DISTINCT FROM NEW.role)
+        EXECUTE FUNCTION users_bump_token_version()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_users_role_token_version ON users")
+    op.execute("DROP FUNCTION IF EXISTS users_bump_token_version()")
+    op.drop_column('users', 'token_version')
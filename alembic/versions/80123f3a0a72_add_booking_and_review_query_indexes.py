@@ -0,0 +1,69 @@
+"""add booking and review query indexes
+
+Revision ID: 80123f3a0a72
+Revises: 81f7e458da39
+Create Date: 2026-10-18 10:02:17.664120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '80123f3a0a72'
+down_revision: Union[str, Sequence[str], None] = '81f7e458da39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A failed concurrent build leaves an INVALID index behind, so check the
+    # unique one up front
+    duplicates = op.get_bind().execute(sa.text("""
+        SELECT count(*) FROM (
+            SELECT booking_id FROM reviews GROUP BY booking_id HAVING count(*) > 1
+        ) d
+    """)).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} bookings have more than one review; "
+            "remove the duplicates before applying this migration"
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_bookings_service_active_window', 'bookings',
+            ['service_id', 'start_time', 'end_time'],
+            postgresql_where=sa.text("status IN ('pending', 'confirmed')"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_bookings_user_start', 'bookings', ['user_id', 'start_time'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_bookings_status_start', 'bookings', ['status', 'start_time'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_reviews_booking_id', 'reviews', ['booking_id'], unique=True,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_reviews_user_id', 'reviews', ['user_id'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_reviews_user_id', table_name='reviews', postgresql_concurrently=True)
+        op.drop_index('ix_reviews_booking_id', table_name='reviews', postgresql_concurrently=True)
+        op.drop_index('ix_bookings_status_start', table_name='bookings', postgresql_concurrently=True)
+        op.drop_index('ix_bookings_user_start', table_name='bookings', postgresql_concurrently=True)
+        op.drop_index('ix_bookings_service_active_window', table_name='bookings', postgresql_concurrently=True)
@@ -0,0 +1,60 @@
+"""add booking overlap exclusion constraint
+
+Revision ID: 81f7e458da39
+Revises: 699042eb231a
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '81f7e458da39'
+down_revision: Union[str, Sequence[str], None] = '699042eb231a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # btree_gist lets a GiST index combine the service_id equality with the
+    # range overlap operator
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    # start_time/end_time are timestamp without time zone, so the range is a
+    # tsrange (tstzrange over naive columns is not immutable)
+    op.add_column('bookings',
+        sa.Column('during',
+                  postgresql.TSRANGE(),
+                  sa.Computed("tsrange(start_time, end_time, '[)')", persisted=True),
+                  nullable=True)
+    )
+
+    conflicts = op.get_bind().execute(sa.text("""
+        SELECT count(*) FROM bookings a JOIN bookings b
+          ON a.service_id = b.service_id AND a.id < b.id AND a.during && b.during
+         WHERE a.status IN ('pending', 'confirmed')
+           AND b.status IN ('pending', 'confirmed')
+    """)).scalar()
+    if conflicts:
+        raise RuntimeError(
+            f"{conflicts} overlapping active booking pairs exist; "
+            "cancel or reschedule them before applying this migration"
+        )
+
+    op.execute("""
+        ALTER TABLE bookings
+          ADD CONSTRAINT ex_bookings_service_overlap
+          EXCLUDE USING gist (service_id WITH =, during WITH &&)
+          WHERE (status IN ('pending', 'confirmed'))
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ex_bookings_service_overlap', 'bookings')
+    op.drop_column('bookings', 'during')
@@ -0,0 +1,75 @@
+"""add service rating aggregates
+
+Revision ID: f8cc258e8cc0
+Revises: ffb3575f3611
+Create Date: 2026-10-18 13:05:52.204718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f8cc258e8cc0'
+down_revision: Union[str, Sequence[str], None] = 'ffb3575f3611'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+RATING_COLUMNS = ['rating_count', 'rating_sum', 'rating_1', 'rating_2', 'rating_3', 'rating_4', 'rating_5']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name in RATING_COLUMNS:
+        op.add_column('services',
+            sa.Column(name, sa.Integer(), server_default='0', nullable=False)
+        )
+    op.add_column('services',
+        sa.Column('rating_average',
+                  sa.Float(),
+                  sa.Computed(
+                      "CASE WHEN rating_count > 0 THEN rating_sum::float8 / rating_count END",
+                      persisted=True,
+                  ),
+                  nullable=True)
+    )
+
+    # Backfill from existing reviews
+    op.execute("""
+        UPDATE services s SET
+            rating_count = a.rating_count,
+            rating_sum = a.rating_sum,
+            rating_1 = a.rating_1,
+            rating_2 = a.rating_2,
+            rating_3 = a.rating_3,
+            rating_4 = a.rating_4,
+            rating_5 = a.rating_5
+        FROM (
+            SELECT b.service_id,
+                   count(*) AS rating_count,
+                   sum(r.rating) AS rating_sum,
+                   count(*) FILTER (WHERE r.rating = 1) AS rating_1,
+                   count(*) FILTER (WHERE r.rating = 2) AS rating_2,
+                   count(*) FILTER (WHERE r.rating = 3) AS rating_3,
+                   count(*) FILTER (WHERE r.rating = 4) AS rating_4,
+                   count(*) FILTER (WHERE r.rating = 5) AS rating_5
+            FROM reviews r JOIN bookings b ON b.id = r.booking_id
+            GROUP BY b.service_id
+        ) a
+        WHERE s.id = a.service_id
+    """)
+
+    op.create_index(
+        'ix_services_rating_average', 'services',
+        [sa.text('rating_average DESC NULLS LAST')],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_services_rating_average', table_name='services')
+    op.drop_column('services', 'rating_average')
+    for name in reversed(RATING_COLUMNS):
+        op.drop_column('services', name)
@@ -0,0 +1,54 @@
+"""add service full text search
+
+Revision ID: ffb3575f3611
+Revises: 80123f3a0a72
+Create Date: 2026-10-18 11:40:03.517992
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ffb3575f3611'
+down_revision: Union[str, Sequence[str], None] = '80123f3a0a72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('services',
+        sa.Column('search_vector',
+                  postgresql.TSVECTOR(),
+                  sa.Computed(SEARCH_VECTOR, persisted=True),
+                  nullable=True)
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_services_search_vector', 'services', ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_services_name_trgm', 'services', ['name'],
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_services_name_trgm', table_name='services')
+    op.drop_index('ix_services_search_vector', table_name='services')
+    op.drop_column('services', 'search_vector')
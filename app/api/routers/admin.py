@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from app.core.cache import cache_stats
+from app.core.config import settings
+from app.core.loop_watchdog import loop_watchdog
+from app.core.profiling import find_profile, recent_profiles
+from app.db.pool_metrics import pool_metrics
+from app.db.session import replicas
+from app.db.slow_queries import slow_query_log
+from app.services.security import require_admin
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/cache")
+async def get_cache_stats():
+    """Hit/miss/eviction counters of the in-process caches (Admin only)."""
+    return cache_stats()
+
+@router.get("/db/pool")
+async def get_pool_stats():
+    """Connection pool occupancy, checkout counters and wait-time histogram per engine (Admin only)."""
+    return {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+
+@router.get("/db/replicas")
+async def get_replica_stats():
+    """Health and read counts of the configured read replicas (Admin only)."""
+    return replicas.stats()
+
+@router.get("/db/slow-queries")
+async def get_slow_queries():
+    """Statements slower than SLOW_QUERY_MS, grouped by fingerprint, slowest total first, with their plans (Admin only)."""
+    return {
+        "threshold_ms": slow_query_log.threshold_ms,
+        "dropped": slow_query_log.dropped,
+        "queries": slow_query_log.entries(),
+    }
+
+@router.delete("/db/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_slow_queries():
+    """Empty the slow query table so plans are captured afresh (Admin only)."""
+    slow_query_log.clear()
+
+@router.get("/profiles")
+async def get_profiles():
+    """The last PROFILE_HISTORY request profiles, newest first (Admin only).
+
+    Any request sent with an admin token and `X-Profile: 1` is profiled; its
+    id comes back in the X-Profile-Id response header.
+    """
+    return [profile.summary() for profile in recent_profiles()]
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """Collapsed stacks of one profile, for flamegraph.pl or speedscope (Admin only)."""
+    profile = find_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile.collapsed()
+
+@router.get("/loop-stalls")
+async def get_loop_stalls():
+    """Event loop stalls longer than LOOP_STALL_MS, newest first, with the loop thread's stack (Admin only)."""
+    return {
+        "enabled": loop_watchdog.running,
+        "threshold_ms": settings.loop_stall_ms,
+        "stalls": loop_watchdog.stalls(),
+    }
@@ -1,44 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi import Response
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_db, run_db
 from app.repositories import user_repo
 from app.schemas.user import UserRead, UserCreate
-from app.services.auth import create_access_token, create_refresh_token, decode_access_token
-from app.services.security import verify_password
+from app.services.auth import (
+    access_token_claims,
+    create_access_token,
+    create_refresh_token,
+    current_token_version,
+    decode_access_token,
+    is_token_revoked,
+    oauth2_scheme,
+    revoke_token,
+    revoke_user_tokens,
+)
+from app.services.security import hash_password_async, verify_password_async
 from app.core.config import settings  # Add this import to access settings
+from app.core.timing import TimedRoute
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=TimedRoute)
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Session = Depends(get_db)):
     print(f"\n=== Starting registration for {user.email} ===")
     try:
-        db_user = user_repo.get_user_by_email(db, user.email)
-        if db_user:
+        # Hash first so the insert is a single round trip; a duplicate email
+        # simply inserts nothing
+        hashed_password = await hash_password_async(user.password)
+        new_user = await run_db(db, user_repo.insert_user_if_new, user, hashed_password)
+        if new_user is None:
             print(f"User with email {user.email} already exists")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered",
             )
         
-        print("Creating new user...")
-        new_user = user_repo.create_user(db, user)
         print(f"User created with ID: {new_user.id}")
-        
-        # Double-check the user was persisted
-        saved_user = user_repo.get_user_by_id(db, new_user.id)
-        if saved_user:
-            print(f"Successfully verified user in database: {saved_user.id}")
-        else:
-            print("WARNING: User not found in database after creation!")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="User creation failed"
-            )
-            
         return new_user
     except Exception as e:
         print(f"Error during registration: {str(e)}")
@@ -50,16 +50,16 @@ async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    user = user_repo.get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_db(db, user_repo.get_user_by_email, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": str(user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(user.id)})
+    access_token = create_access_token(data=access_token_claims(user))
+    refresh_token = create_refresh_token(data={"sub": str(user.id), "ver": user.token_version or 0})
     response.set_cookie(
         key="access_token",
         value=f"Bearer {access_token}",
@@ -70,7 +70,7 @@ async def login(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/refresh")
-def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
     payload = decode_access_token(refresh_token)
     if not payload or "sub" not in payload or payload.get("type") != "refresh":
         raise HTTPException(
@@ -78,8 +78,16 @@ def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
             detail="Invalid or expired refresh token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if await is_token_revoked(db, payload) or (
+        "ver" in payload and payload["ver"] != await current_token_version(db, payload["sub"])
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
-    user = user_repo.get_user_by_id(db, payload["sub"])
+    user = await run_db(db, user_repo.get_user_by_id, payload["sub"])
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -87,11 +95,31 @@ def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_access_token(data=access_token_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-def logout():
-    # Note: JWT logout typically requires blacklisting, which is not implemented here
-    # For simplicity, we assume client discards token
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    refresh_token: str | None = None,
+    logout_all: bool = Query(False, alias="all"),
+    db: Session = Depends(get_db)
+):
+    """Revoke this access token (and `refresh_token`, if given); `all=true` logs out every session."""
+    payload = decode_access_token(token)
+    if not payload or "sub" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if logout_all:
+        # Bumping the token version retires every access/refresh token issued so far
+        await revoke_user_tokens(db, payload["sub"])
+        return None
+    
+    await revoke_token(db, payload)
+    refresh_payload = decode_access_token(refresh_token) if refresh_token else None
+    if refresh_payload and refresh_payload.get("sub") == payload["sub"]:
+        await revoke_token(db, refresh_payload)
     return None
\ No newline at end of file
@@ -1,73 +1,98 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.schemas.book_service import ServiceCreate, ServiceRead, ServiceUpdate
+from app.db.session import get_db, get_read_db, run_db
+from app.schemas.book_service import AvailabilityRead, ServiceCreate, ServiceRead, ServiceUpdate
 from app.schemas.user import UserRole
 from app.services import book_service
+from app.services import availability as availability_service
+from app.services.auth import TokenPrincipal, UserSnapshot
 from app.services.security import require_admin
-from app.db.models import User
 from app.services import review as review_service
-from app.schemas.review import ReviewRead
+from app.schemas.review import ServiceReviewPage
+from app.core.config import settings
+from app.core.timing import TimedRoute
+from datetime import datetime
+from typing import Literal
 from uuid import UUID
 
-router = APIRouter(prefix="/services", tags=["services"])
+router = APIRouter(prefix="/services", tags=["services"], route_class=TimedRoute)
 
 @router.post("/", response_model=ServiceRead, status_code=status.HTTP_201_CREATED)
-def create_service(
+async def create_service(
     service_in: ServiceCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    current_user: TokenPrincipal | UserSnapshot = Depends(require_admin),
 ):
     """Create a new service (Admin only)."""
-    return book_service.create_service(db, service_in)
+    return await run_db(db, book_service.create_service, service_in)
 
 @router.get("/", response_model=list[ServiceRead])
-def list_services(
+async def list_services(
     q: str | None = None,
     price_min: float | None = None,
     price_max: float | None = None,
     active: bool | None = None,
+    min_rating: float | None = Query(None, ge=1, le=5),
+    sort: Literal["rating"] | None = Query(None, description="`rating`: highest average rating first"),
+    # Primary, not a replica: the result is cached and a lagging replica would
+    # put back what a write just invalidated
     db: Session = Depends(get_db)
 ):
     """List all available services with optional filters."""
-    return book_service.get_services(db, q, price_min, price_max, active)
+    payload = await run_db(db, book_service.get_services_json, q, price_min, price_max, active, min_rating, sort)
+    return Response(content=payload, media_type="application/json")
 
 @router.get("/{service_id}", response_model=ServiceRead)
-def get_service(service_id: UUID, db: Session = Depends(get_db)):
+async def get_service(service_id: UUID, db: Session = Depends(get_db)):
     """Get a single service by ID."""
-    service = book_service.get_service(db, service_id)
-    if not service:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
-    return service
+    payload = await run_db(db, book_service.get_service_json, service_id)
+    return Response(content=payload, media_type="application/json")
+
+@router.get("/{service_id}/availability", response_model=AvailabilityRead)
+async def get_service_availability(
+    service_id: UUID,
+    window_start: datetime = Query(..., alias="from"),
+    window_end: datetime = Query(..., alias="to"),
+    granularity: int | None = Query(
+        None, ge=1, le=1440,
+        description="Minutes between candidate slot starts (defaults to the service duration)"
+    ),
+    db: Session = Depends(get_read_db)
+):
+    """List open slots of the service's duration between `from` and `to`."""
+    return await run_db(db, availability_service.get_availability, service_id, window_start, window_end, granularity)
 
 @router.patch("/{service_id}", response_model=ServiceRead)
-def update_service(
+async def update_service(
     service_id: UUID,  # Changed from int to UUID
     service_in: ServiceUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    current_user: TokenPrincipal | UserSnapshot = Depends(require_admin),
 ):
     """Update an existing service (Admin only)."""
-    service = book_service.update_service(db, service_id, service_in)
+    service = await run_db(db, book_service.update_service, service_id, service_in)
     if not service:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
     return service
 
 @router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_service(
+async def delete_service(
     service_id: UUID,  # Changed from int to UUID
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_admin),
+    current_user: TokenPrincipal | UserSnapshot = Depends(require_admin),
 ):
     """Delete a service (Admin only)."""
-    ok = book_service.delete_service(db, service_id)
+    ok = await run_db(db, book_service.delete_service, service_id)
     if not ok:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
 
-@router.get("/{service_id}/reviews", response_model=list[ReviewRead])
-def get_service_reviews(
+@router.get("/{service_id}/reviews", response_model=ServiceReviewPage)
+async def get_service_reviews(
     service_id: UUID,
-    db: Session = Depends(get_db)
+    limit: int = Query(settings.page_size_default, ge=1, description=f"Capped at {settings.page_size_max}"),
+    cursor: str | None = None,
+    sort: Literal["recent", "rating"] = Query("recent", description="`recent`: newest first; `rating`: highest rated first"),
+    db: Session = Depends(get_read_db)
 ):
-    """Get reviews for a service by its ID."""
-    return review_service.get_service_reviews(db, service_id)
\ No newline at end of file
+    """Get a page of reviews for a service by its ID."""
+    return await run_db(db, review_service.get_service_review_page, service_id, limit, cursor, sort)
\ No newline at end of file
@@ -1,69 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.schemas.booking import BookingCreate, BookingResponse, BookingUpdate
+from app.core.config import settings
+from app.db.session import get_db, get_read_db, iterate_db, run_db
+from app.schemas.booking import BookingCreate, BookingPage, BookingResponse, BookingUpdate
 from app.services import booking as booking_service
-from app.services.auth import get_current_user
+from app.services.auth import UserSnapshot, get_current_user
 from datetime import datetime
-from app.db.models import User
-from typing import List, Optional
+from app.core.timing import TimedRoute
+from typing import Literal, Optional
 from uuid import UUID
 
-router = APIRouter(prefix="/bookings", tags=["Bookings"])
+router = APIRouter(prefix="/bookings", tags=["Bookings"], route_class=TimedRoute)
 
 @router.post("/", response_model=BookingResponse, status_code=201)
-def create_booking(
+async def create_booking(
     booking: BookingCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    return booking_service.create_booking(db, booking, current_user.id)
+    return await run_db(db, booking_service.create_booking, booking, current_user.id)
 
-@router.get("/me", response_model=List[BookingResponse])
-def get_my_bookings(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+@router.get("/me", response_model=BookingPage)
+async def get_my_bookings(
+    limit: int = Query(settings.page_size_default, ge=1, description=f"Capped at {settings.page_size_max}"),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    return booking_service.get_user_bookings(db, current_user.id)
+    return await run_db(db, booking_service.get_user_bookings, current_user.id, limit, cursor)
 
-@router.get("/", response_model=List[BookingResponse])
-def get_all_bookings(
+@router.get("/", response_model=BookingPage)
+async def get_all_bookings(
     status: Optional[str] = None,
     start_from: Optional[datetime] = None,
     end_to: Optional[datetime] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    limit: int = Query(settings.page_size_default, ge=1, description=f"Capped at {settings.page_size_max}"),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    return booking_service.get_all_bookings(db, status, start_from, end_to)
+    return await run_db(db, booking_service.get_all_bookings, status, start_from, end_to, limit, cursor)
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+@router.get("/export")
+async def export_bookings(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    status: Optional[str] = None,
+    start_from: Optional[datetime] = None,
+    end_to: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user),
+):
+    """Stream all matching bookings as NDJSON or CSV (Admin only)."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    # The get_read_db session stays open until the stream has been fully sent
+    return StreamingResponse(
+        iterate_db(db, booking_service.export_bookings, export_format, status, start_from, end_to),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="bookings.{export_format}"'},
+    )
 
 @router.get("/{booking_id}", response_model=BookingResponse)
-def get_booking(
+async def get_booking(
     booking_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    return booking_service.get_booking(db, booking_id, current_user)
+    return await run_db(db, booking_service.get_booking, booking_id, current_user)
 
 @router.patch("/{booking_id}", response_model=BookingResponse)
-def update_booking(
+async def update_booking(
     booking_id: UUID,
     booking_in: BookingUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only administrators can update bookings")
-    return booking_service.update_booking(db, booking_id, booking_in, current_user)
+    return await run_db(db, booking_service.update_booking, booking_id, booking_in, current_user)
 
 @router.delete("/{booking_id}", status_code=204)
-def delete_booking(
+async def delete_booking(
     booking_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Only administrators can delete bookings")
-    booking_service.delete_booking(db, booking_id, current_user)
+    await run_db(db, booking_service.delete_booking, booking_id, current_user)
     return None
\ No newline at end of file
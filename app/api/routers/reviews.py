@@ -1,41 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from typing import List
-from app.db.session import get_db
+from typing import Literal
+from app.db.session import get_db, get_read_db, run_db
 from app.services import review as review_service
-from app.services.auth import get_current_user
-from app.schemas.review import ReviewCreate, ReviewRead, ReviewUpdate
+from app.services.auth import UserSnapshot, get_current_user
+from app.schemas.review import ReviewCreate, ReviewRead, ReviewUpdate, ServiceReviewPage
 from uuid import UUID
-from app.db.models import User
+from app.core.config import settings
+from app.core.timing import TimedRoute
 
-router = APIRouter(prefix="/reviews", tags=["reviews"])
+router = APIRouter(prefix="/reviews", tags=["reviews"], route_class=TimedRoute)
 
 @router.post("/", response_model=ReviewRead, status_code=status.HTTP_201_CREATED)
-def create_review(
+async def create_review(
     review: ReviewCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    return review_service.create_review(db, review, current_user)
+    return await run_db(db, review_service.create_review, review, current_user)
 
-@router.get("/service/{service_id}/reviews", response_model=List[ReviewRead])
-def get_service_reviews(service_id: UUID, db: Session = Depends(get_db)):
-    return review_service.get_service_reviews(db, service_id)
+@router.get("/service/{service_id}/reviews", response_model=ServiceReviewPage, deprecated=True)
+async def get_service_reviews(
+    service_id: UUID,
+    limit: int = Query(settings.page_size_default, ge=1, description=f"Capped at {settings.page_size_max}"),
+    cursor: str | None = None,
+    sort: Literal["recent", "rating"] = Query("recent", description="`recent`: newest first; `rating`: highest rated first"),
+    db: Session = Depends(get_read_db)
+):
+    """Deprecated alias of GET /services/{service_id}/reviews, with its paginated envelope."""
+    return await run_db(db, review_service.get_service_review_page, service_id, limit, cursor, sort)
 
 @router.patch("/{review_id}", response_model=ReviewRead)
-def update_review(
+async def update_review(
     review_id: UUID,
     review_in: ReviewUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    return review_service.update_review(db, review_id, review_in, current_user)
+    return await run_db(db, review_service.update_review, review_id, review_in, current_user)
 
 @router.delete("/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_review(
+async def delete_review(
     review_id: UUID,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
-    review_service.delete_review(db, str(review_id), current_user)
+    await run_db(db, review_service.delete_review, str(review_id), current_user)
     return None
\ No newline at end of file
@@ -1,40 +1,48 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.db.session import get_db
-from app.services.auth import get_current_user
-from app.services.security import hash_password
+from app.db.session import get_db, run_db
+from app.services.auth import UserSnapshot, get_current_user, invalidate_cached_user
+from app.services.security import hash_password_async
 from app.schemas.user import UserRead, UserUpdate
 from app.db.models import User
 from app.repositories import user_repo
+from app.core.timing import TimedRoute
 
-router = APIRouter(tags=["users"])
+router = APIRouter(tags=["users"], route_class=TimedRoute)
 
 @router.get("/me", response_model=UserRead)
-def get_my_profile(current_user: User = Depends(get_current_user)):
+async def get_my_profile(current_user: UserSnapshot = Depends(get_current_user)):
     """Get current user profile."""
     return current_user
 
+def _apply_profile_update(db: Session, user: User, updates: dict) -> User:
+    for field, value in updates.items():
+        setattr(user, field, value)
+    db.commit()
+    db.refresh(user)
+    return user
+
 @router.patch("/me", response_model=UserRead)
-def update_my_profile(
+async def update_my_profile(
     user_in: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     """Update current user profile."""
-    user = user_repo.get_user_by_id(db, current_user.id)
+    user = await run_db(db, user_repo.get_user_by_id, current_user.id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
     if user_in.email and user_in.email != current_user.email:
-        existing_user = user_repo.get_user_by_email(db, user_in.email)
+        existing_user = await run_db(db, user_repo.get_user_by_email, user_in.email)
         if existing_user:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already in use")
     
-    for field, value in user_in.dict(exclude_unset=True).items():
-        if field == "password":
-            value = hash_password(value)
-        setattr(user, field, value)
+    updates = user_in.dict(exclude_unset=True)
+    if "password" in updates:
+        # The model stores only the hash; hash off the event loop
+        updates["hashed_password"] = await hash_password_async(updates.pop("password"))
     
-    db.commit()
-    db.refresh(user)
+    user = await run_db(db, _apply_profile_update, user, updates)
+    invalidate_cached_user(user.id)
     return user
\ No newline at end of file
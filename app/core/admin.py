@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_sync_db
 from app.db.models import User, UserRole
 from passlib.context import CryptContext
 from uuid import uuid4
@@ -16,7 +16,7 @@ def hash_password_local(password: str) -> str:
 
 def create_default_admin():
     """Create a default admin user if none exists."""
-    db = next(get_db())
+    db = next(get_sync_db())
     try:
         # Check if any admin user exists
         admin_user = db.query(User).filter(User.role == UserRole.ADMIN).first()
@@ -0,0 +1,98 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Protocol
+from app.core.metrics import cache_lookups
+
+class RegisteredCache(Protocol):
+    def stats(self) -> dict: ...
+    def clear(self) -> None: ...
+
+# name -> cache, for the admin endpoint and for resetting state between tests
+_registry: dict[str, RegisteredCache] = {}
+
+def register_cache(name: str, cache: RegisteredCache) -> None:
+    """Expose a cache's counters under `name` in cache_stats()."""
+    _registry[name] = cache
+
+def cache_stats() -> dict[str, dict]:
+    """Counters of every registered in-process cache."""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+def clear_caches() -> None:
+    """Drop the entries of every registered cache."""
+    for cache in _registry.values():
+        cache.clear()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire `ttl` seconds after being set."""
+
+    def __init__(self, name: str | None, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        if name:
+            register_cache(name, self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    if self.name:
+                        cache_lookups.inc(self.name, "hit")
+                    return value
+                del self._data[key]
+            self.misses += 1
+        if self.name:
+            cache_lookups.inc(self.name, "miss")
+        return default
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Like get() but without touching recency or the hit/miss counters."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
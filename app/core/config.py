@@ -1,12 +1,103 @@
 import os
+from typing import Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     database_url: str
+    # "sync": psycopg2 sessions driven from the thread pool; "async": asyncpg
+    # AsyncSession, with no thread hop per query
+    db_backend: Literal["sync", "async"] = "sync"
+    
+    # Connection pool (per engine, per worker process)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 300
+    # A SELECT 1 on every checkout; pool_recycle already retires old connections
+    db_pool_pre_ping: bool = True
+    # Server-side statement_timeout in ms (0 disables it)
+    db_statement_timeout_ms: int = 0
+    
+    # Read replicas for GET endpoints, as a JSON list of URLs (empty: everything hits the primary)
+    replica_database_url: list[str] = []
+    # Seconds a replica that failed to connect is skipped before being tried again
+    replica_retry_seconds: float = 30.0
+    # Seconds after a client's last write during which its reads stay on the primary.
+    # Tracked in a cookie and, per worker, by bearer token user: a client without
+    # the cookie loses the window when its next request reaches another worker.
+    read_your_writes_seconds: float = 5.0
     jwt_secret: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
     
+    # Password hashing (bcrypt runs on a dedicated pool, off the event loop)
+    password_hash_workers: int = 4
+    
+    # Keyset pagination
+    page_size_default: int = 50
+    page_size_max: int = 200
+    
+    # Public service catalog cache (pre-serialized JSON)
+    service_cache_ttl_seconds: float = 30.0
+    service_cache_max_entries: int = 512
+    
+    # In-process booking conflict pre-check (the DB constraint stays authoritative).
+    # Hits are trusted: a slot freed by another worker can still get a 409 from
+    # this one until its entry is older than booking_index_ttl_seconds.
+    booking_index_enabled: bool = False
+    booking_index_max_services: int = 1024
+    booking_index_ttl_seconds: float = 30.0
+    
+    # Authenticated user snapshots (saves the per-request user lookup)
+    user_cache_ttl_seconds: float = 60.0
+    user_cache_max_entries: int = 10_000
+    # How long a token version is trusted before it is re-read (logout/role change propagation)
+    token_version_ttl_seconds: float = 15.0
+    
+    # Revoked JWTs (Bloom filter front, revoked_tokens table as source of truth)
+    revocation_sync_seconds: float = 5.0
+    revocation_filter_capacity: int = 100_000
+    revocation_filter_error_rate: float = 0.001
+    
+    # Request log: records wait in a bounded queue for the writer thread (dropped when full);
+    # a sample rate below 1 keeps only that fraction of the 2xx lines while the queue
+    # is at least request_log_sample_queue_fill full
+    request_log_queue_size: int = 10_000
+    request_log_sample_2xx: float = 1.0
+    request_log_sample_queue_fill: float = 0.5
+    
+    # GET /metrics (Prometheus text format). With several workers, point this at an
+    # empty directory shared by them so any worker can report the totals of all.
+    metrics_enabled: bool = True
+    metrics_multiprocess_dir: str | None = None
+    
+    # Per-request spans (auth, endpoint, booking steps, response rendering) in the
+    # Server-Timing header; off, a span costs one context variable lookup
+    server_timing: bool = False
+    # Also add the span breakdown to the request log line
+    server_timing_log: bool = False
+    
+    # Requests that issue one statement this many times are logged as likely N+1 (0 disables)
+    n_plus_one_threshold: int = 5
+    
+    # Slow query log: statements slower than this (ms, 0 disables) are kept by
+    # fingerprint, top N by total time, with an EXPLAIN captured once per fingerprint
+    slow_query_ms: float = 200.0
+    slow_query_top_n: int = 50
+    slow_query_explain: bool = True
+    
+    # On-demand profiling: an admin sending `X-Profile: 1` gets that request sampled
+    # every interval (ms); the last N profiles are kept for GET /admin/profiles
+    profiling_enabled: bool = True
+    profile_interval_ms: float = 1.0
+    profile_history: int = 20
+    
+    # Event loop watchdog (opt-in): stalls longer than this (ms) are recorded with the
+    # loop thread's stack and the route being served; the last N are kept
+    loop_watchdog_enabled: bool = False
+    loop_stall_ms: float = 100.0
+    loop_stall_history: int = 50
+    
     # Production settings
     environment: str = "development"
     debug: bool = True
@@ -23,6 +114,12 @@ class Settings(BaseSettings):
     
     def get_db_url(self) -> str:
         return self.database_url
+    
+    def get_async_db_url(self, url: str | None = None) -> str:
+        """`url` (default: database_url) with the asyncpg driver (postgresql:// -> postgresql+asyncpg://)."""
+        url = url or self.database_url
+        scheme, rest = url.split("://", 1)
+        return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgres") else url
 
 # Auto-detect production environment
 if os.getenv("RENDER"):
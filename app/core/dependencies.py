@@ -0,0 +1,30 @@
+from contextlib import AsyncExitStack
+from typing import Any, Callable
+from fastapi import Depends, Request
+from fastapi.dependencies.utils import get_dependant, solve_dependencies
+from fastapi.exceptions import RequestValidationError
+
+
+async def resolve_dependency(request: Request, dependency: Callable) -> Any:
+    """Resolve `dependency` for a request outside of any route (e.g. in middleware).
+
+    Goes through FastAPI's own solver, so sub-dependencies, the app's
+    dependency_overrides and yield dependencies behave as they do for a
+    route; the latter are closed before this returns. Raises what the
+    dependency raises, or RequestValidationError for missing/invalid inputs.
+    """
+
+    def target(value=Depends(dependency)):
+        return value
+
+    async with AsyncExitStack() as stack:
+        # Own exit stack: the route's, set up later, must not see these dependencies
+        request = Request({**request.scope, "fastapi_astack": stack}, request.receive)
+        values, errors, *_ = await solve_dependencies(
+            request=request,
+            dependant=get_dependant(path=request.url.path, call=target),
+            dependency_overrides_provider=request.app,
+        )
+        if errors:
+            raise RequestValidationError(errors)
+        return values["value"]
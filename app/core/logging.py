@@ -1,28 +1,190 @@
 import logging
 import json
-from fastapi import Request, Response
+import queue
+import random
+from contextlib import nullcontext
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from time import perf_counter_ns
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.timing import RequestTiming, track_timing
+from app.db.query_stats import track_queries
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def log_requests(request: Request, call_next):
-    log_data = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
-        "method": request.method,
-        "url": str(request.url),
-        "client": request.client.host if request.client else "unknown",
-    }
-    
-    try:
-        start_time = datetime.now(timezone.utc)
-        response = await call_next(request)
-        duration = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000  # ms
-        log_data["status_code"] = response.status_code
-        log_data["duration_ms"] = duration
-        logger.info(json.dumps(log_data))
-        return response
-    except Exception as e:
-        log_data["error"] = str(e)
-        logger.error(json.dumps(log_data))
-        raise
\ No newline at end of file
+# One JSON line per request. Records go through a bounded queue and are
+# formatted and written by a listener thread, never on the event loop.
+access_logger = logging.getLogger("app.access")
+access_logger.propagate = False
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Formats the field dict of an access record as one JSON line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = dict(record.msg)
+        url = f"{fields.pop('scheme')}://{fields.pop('host')}{fields.pop('path')}"
+        query_string = fields.pop("query_string")
+        if query_string:
+            url += "?" + query_string.decode("latin-1")
+        timestamp = datetime.fromtimestamp(record.created, timezone.utc).isoformat()
+        return json.dumps({"timestamp": timestamp, "method": fields.pop("method"), "url": url, **fields})
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that hands records over untouched and drops them when the queue is full.
+
+    The stock prepare() formats the record on the calling thread; records
+    here are built for the listener and never reused, so that copy is skipped.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """QueueListener whose stop() waits for room for its sentinel in a full queue.
+
+    The stock enqueue_sentinel() uses put_nowait and raises queue.Full when the
+    queue is full at shutdown; the writer thread is still draining it, so a
+    blocking put gets through once the records ahead of it are written.
+    """
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
+
+
+_log_queue: queue.Queue = queue.Queue(maxsize=settings.request_log_queue_size)
+_queue_handler = DroppingQueueHandler(_log_queue)
+access_logger.addHandler(_queue_handler)
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(JsonLineFormatter())
+_listener = DrainingQueueListener(_log_queue, _stream_handler, respect_handler_level=False)
+
+
+def start_request_logging() -> None:
+    """Start the thread that writes queued access records (application startup)."""
+    if _listener._thread is None:
+        _listener.start()
+
+
+def stop_request_logging() -> None:
+    """Flush the queued access records and stop the writer thread (application shutdown)."""
+    if _listener._thread is not None:
+        _listener.stop()
+
+
+def _client_host(scope: Scope) -> str:
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def _host(scope: Scope) -> str:
+    for name, value in scope["headers"]:
+        if name == b"host":
+            return value.decode("latin-1")
+    server = scope.get("server")
+    return f"{server[0]}:{server[1]}" if server else ""
+
+
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware logging method, URL, status, latency and SQL counts per request.
+
+    Also sets the Server-Timing header with the request's database time and,
+    with SERVER_TIMING on, the spans recorded through app.core.timing. Under
+    load, i.e. while the log queue is at least `sample_queue_fill` full, 2xx
+    lines without an N+1 warning are kept with probability `sample_2xx`.
+    """
+
+    def __init__(self, app: ASGIApp, sample_2xx: float = 1.0, sample_queue_fill: float = 0.5):
+        self.app = app
+        self.sample_2xx = sample_2xx
+        self.sample_queue_size = sample_queue_fill * _log_queue.maxsize
+        # Servers that skip lifespan events never call start_request_logging()
+        start_request_logging()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter_ns()
+        status_code = 500
+
+        with track_queries() as queries, track_timing() if settings.server_timing else nullcontext() as timing:
+
+            async def send_wrapper(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    server_timing = f'db;dur={queries.duration_ms:.1f};desc="{queries.count} queries"'
+                    if timing is not None and timing.spans:
+                        server_timing += ", " + timing.server_timing()
+                    MutableHeaders(scope=message).append("Server-Timing", server_timing)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            except Exception as e:
+                # 500 unless the response had already started
+                self._log(scope, start, status_code, queries, timing, error=str(e))
+                raise
+            self._log(scope, start, status_code, queries, timing)
+
+    def _log(
+        self,
+        scope: Scope,
+        start: int,
+        status_code: int,
+        queries,
+        timing: RequestTiming | None,
+        error: str | None = None,
+    ) -> None:
+        repeated = settings.n_plus_one_threshold and queries.repeated(settings.n_plus_one_threshold)
+        if (
+            200 <= status_code < 300
+            and not repeated
+            and self.sample_2xx < 1.0
+            and _log_queue.qsize() >= self.sample_queue_size
+            and random.random() >= self.sample_2xx
+        ):
+            return
+        fields = {
+            "method": scope["method"],
+            "scheme": scope.get("scheme", "http"),
+            "host": _host(scope),
+            "path": scope["path"],
+            "query_string": scope.get("query_string", b""),
+            "client": _client_host(scope),
+            "status_code": status_code,
+            "duration_ms": (perf_counter_ns() - start) / 1_000_000,
+            "db_queries": queries.count,
+            "db_ms": round(queries.duration_ms, 3),
+        }
+        if timing is not None and settings.server_timing_log:
+            fields["timing"] = timing.breakdown()
+        level = logging.INFO
+        if error is not None:
+            fields["error"] = error
+            level = logging.ERROR
+        elif repeated:
+            # Same SQL issued over and over: most likely a lazy load inside a loop
+            fields["n_plus_one"] = repeated
+            level = logging.WARNING
+        if not access_logger.isEnabledFor(level):
+            return
+        # Built directly: Logger.info() would walk the stack for the caller's file and line
+        access_logger.handle(logging.LogRecord(access_logger.name, level, "", 0, fields, None, None))
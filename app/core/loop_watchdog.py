@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import sys
+import threading
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from time import perf_counter
+from types import FrameType
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+NO_ROUTE = "<none>"
+
+loop_stall_duration = registry.histogram(
+    "bookit_event_loop_stall_seconds", "Event loop stalls longer than LOOP_STALL_MS by route", ("route",)
+)
+
+
+class LoopStall:
+    def __init__(self, method: str | None, route: str | None, stack: list[str], lag_ms: float):
+        self.detected_at = datetime.now(timezone.utc)
+        self.method = method
+        self.route = route
+        self.stack = stack
+        # Grows to the full stall once the loop ticks again
+        self.duration_ms = lag_ms
+        self.ended = False
+
+    def snapshot(self) -> dict:
+        return {
+            "detected_at": self.detected_at.isoformat(),
+            "method": self.method,
+            "route": self.route,
+            "duration_ms": round(self.duration_ms, 3),
+            "ended": self.ended,
+            "stack": self.stack,
+        }
+
+
+class LoopWatchdog:
+    """Detects event loop stalls and records what the loop thread was running.
+
+    A callback rescheduled on the loop every `threshold_ms / 4` is the
+    heartbeat. A monitor thread checks it at the same pace; once the loop is
+    `threshold_ms` late, it takes the loop thread's stack, once per stall, and
+    finds the request being served in the ASGI scope of the middleware frames
+    on it. The next heartbeat fixes the stall's full duration. Nothing runs
+    per request. Stalls outside a request (e.g. startup) have no route.
+    """
+
+    def __init__(self, threshold_ms: float, history: int):
+        self.threshold = threshold_ms / 1000
+        self.interval = self.threshold / 4
+        self._stalls: deque[LoopStall] = deque(maxlen=history)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread = 0
+        self._handle: asyncio.TimerHandle | None = None
+        self._last_beat = 0.0
+        # The stall being timed, with the heartbeat it started after
+        self._pending: tuple[LoopStall, float] | None = None
+        self._stop = threading.Event()
+        self._monitor: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._monitor is not None
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the heartbeat and monitor (from the loop's thread, e.g. application startup)."""
+        if self.running:
+            return
+        self._loop, self._loop_thread = loop, threading.get_ident()
+        self._last_beat = perf_counter()
+        self._handle = loop.call_later(self.interval, self._beat)
+        self._stop.clear()
+        self._monitor = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._monitor.start()
+
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._monitor.join()
+        self._monitor = None
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _beat(self) -> None:
+        now = perf_counter()
+        if self._pending is not None:
+            stall, since = self._pending
+            self._pending = None
+            stall.duration_ms = (now - since - self.interval) * 1000
+            stall.ended = True
+            loop_stall_duration.observe(stall.duration_ms / 1000, stall.route or NO_ROUTE)
+        self._last_beat = now
+        self._handle = self._loop.call_later(self.interval, self._beat)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            last_beat = self._last_beat
+            lag = perf_counter() - last_beat - self.interval
+            if lag < self.threshold or self._pending is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            # Read before formatting the stack, which gives the loop time to move on
+            task = asyncio.current_task(self._loop)
+            if frame is None or self._last_beat != last_beat:
+                continue
+            stack = [
+                f"{entry.filename}:{entry.lineno} in {entry.name}: {entry.line}"
+                for entry in traceback.extract_stack(frame)
+            ]
+            method, route = self._request(frame, task)
+            stall = LoopStall(method, route, stack, lag * 1000)
+            self._pending = (stall, last_beat)
+            self._stalls.append(stall)
+            logger.warning(
+                "event loop stalled for %.0f ms+ in %s %s at %s", lag * 1000, method, route, stack[-1] if stack else "?"
+            )
+
+    def _request(self, frame: FrameType, task: asyncio.Task | None) -> tuple[str | None, str | None]:
+        scope = self._scope(frame)
+        if scope is None and task is not None:
+            # In a greenlet (AsyncSession.run_sync) the stack stops short of the ASGI
+            # frames; uvicorn's run_asgi, the task's outermost coroutine, holds the scope
+            root = task.get_coro().cr_frame
+            scope = getattr(root.f_locals.get("self"), "scope", None) if root is not None else None
+        if not isinstance(scope, dict) or scope.get("type") != "http":
+            return None, None
+        # The router stores the matched route in the scope; its path is the template
+        return scope["method"], getattr(scope.get("route"), "path", scope["path"])
+
+    @staticmethod
+    def _scope(frame: FrameType | None) -> dict | None:
+        # Every ASGI middleware frame holds the request's scope, shared down to the router
+        while frame is not None:
+            scope = frame.f_locals.get("scope")
+            if isinstance(scope, dict) and scope.get("type") == "http":
+                return scope
+            frame = frame.f_back
+        return None
+
+    def stalls(self) -> list[dict]:
+        """Recorded stalls, newest first."""
+        return [stall.snapshot() for stall in reversed(list(self._stalls))]
+
+
+loop_watchdog = LoopWatchdog(settings.loop_stall_ms, settings.loop_stall_history)
+
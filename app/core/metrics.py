@@ -0,0 +1,299 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from glob import glob
+from time import perf_counter_ns
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.db.query_stats import current_query_stats
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+_HEADER = struct.Struct("<I4x")
+_KEY_LENGTH = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+
+
+class MmapStore:
+    """Append-only (key -> float64) slots in a file written by one worker process.
+
+    Layout: an 8-byte header holding the used size, then entries of
+    [uint32 key length][utf-8 key, padded to 8 bytes][float64 value]. A slot
+    has a single writer (one thread of one process), so value updates are
+    plain 8-byte writes; only allocating a slot takes the lock. Readers in
+    other processes parse the file up to the used size.
+    """
+
+    def __init__(self, path: str, initial_size: int = 1 << 16):
+        self.path = path
+        self._file = open(path, "a+b")
+        self._size = max(initial_size, os.path.getsize(path))
+        self._file.truncate(self._size)
+        self._mm = mmap.mmap(self._file.fileno(), self._size)
+        self._old_maps: list[mmap.mmap] = []
+        self._used = _HEADER.unpack_from(self._mm, 0)[0] or _HEADER.size
+        self._lock = threading.Lock()
+
+    def allocate(self, key: str) -> int:
+        """Append a zeroed slot for `key` and return the offset of its value."""
+        encoded = key.encode()
+        padded = (_KEY_LENGTH.size + len(encoded) + 7) // 8 * 8
+        with self._lock:
+            entry_size = padded + _VALUE.size
+            if self._used + entry_size > self._size:
+                self._grow(self._used + entry_size)
+            offset = self._used
+            _KEY_LENGTH.pack_into(self._mm, offset, len(encoded))
+            self._mm[offset + _KEY_LENGTH.size:offset + _KEY_LENGTH.size + len(encoded)] = encoded
+            _VALUE.pack_into(self._mm, offset + padded, 0.0)
+            self._used += entry_size
+            _HEADER.pack_into(self._mm, 0, self._used)
+            return offset + padded
+
+    def write(self, offset: int, value: float) -> None:
+        _VALUE.pack_into(self._mm, offset, value)
+
+    def _grow(self, needed: int) -> None:
+        while self._size < needed:
+            self._size *= 2
+        self._file.truncate(self._size)
+        # Other threads may still hold the old mapping; it shares the file's pages, so keep it open
+        self._old_maps.append(self._mm)
+        self._mm = mmap.mmap(self._file.fileno(), self._size)
+
+    @staticmethod
+    def read(path: str) -> list[tuple[str, float]]:
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _HEADER.size:
+            return []
+        used, offset, entries = _HEADER.unpack_from(data, 0)[0], _HEADER.size, []
+        while offset < used:
+            length = _KEY_LENGTH.unpack_from(data, offset)[0]
+            key = data[offset + _KEY_LENGTH.size:offset + _KEY_LENGTH.size + length].decode()
+            padded = (_KEY_LENGTH.size + length + 7) // 8 * 8
+            entries.append((key, _VALUE.unpack_from(data, offset + padded)[0]))
+            offset += padded + _VALUE.size
+        return entries
+
+
+class _Shard:
+    """The samples recorded by one thread. Only that thread writes them, so no lock is needed."""
+
+    def __init__(self, shard_id: int, store: MmapStore | None):
+        self.id = shard_id
+        self.values: dict[tuple, float] = {}
+        self.store = store
+        self.slots: dict[tuple, int] = {}
+
+    def add(self, key: tuple, amount: float) -> None:
+        value = self.values[key] = self.values.get(key, 0.0) + amount
+        if self.store is not None:
+            offset = self.slots.get(key)
+            if offset is None:
+                offset = self.slots[key] = self.store.allocate(json.dumps([self.id, key[0], list(key[1]), key[2]]))
+            self.store.write(offset, value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help: str, labelnames: tuple[str, ...]):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self.registry._shard().add((self.name, labels, ""), amount)
+
+
+class Gauge(Counter):
+    """Summed across threads and workers, so only inc()/dec() around an activity make sense."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help, labelnames, buckets: tuple[float, ...]):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self.registry._shard()
+        shard.add((self.name, labels, bisect_left(self.buckets, value)), 1.0)
+        shard.add((self.name, labels, "sum"), value)
+        shard.add((self.name, labels, "count"), 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class MetricsRegistry:
+    """Per-worker counters, gauges and fixed-bucket histograms, rendered in Prometheus text format.
+
+    Every thread records into its own shard and a scrape sums the shards, so
+    the request path takes no lock. With `multiprocess_dir` set, every shard
+    also writes through to a per-process MmapStore in that directory, and a
+    scrape served by any worker sums the files of all of them. The directory
+    should be emptied before the workers start.
+    """
+
+    def __init__(self, multiprocess_dir: str | None = None):
+        self.multiprocess_dir = multiprocess_dir
+        self._metrics: dict[str, Metric] = {}
+        self._shards: list[_Shard] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._store: MmapStore | None = None
+        self._generation = 0
+        if multiprocess_dir:
+            os.makedirs(multiprocess_dir, exist_ok=True)
+            os.register_at_fork(after_in_child=self._forget_parent)
+
+    def _register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(self, name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(self, name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DURATION_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(self, name, help, labelnames, buckets))
+
+    def _forget_parent(self) -> None:
+        # A forked worker must not write into its parent's file or shards
+        self._shards, self._store, self._local = [], None, threading.local()
+        self._lock = threading.Lock()
+        self._generation += 1
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            with self._lock:
+                if self.multiprocess_dir and self._store is None:
+                    self._store = MmapStore(os.path.join(self.multiprocess_dir, f"metrics_{os.getpid()}.db"))
+                shard = self._local.shard = _Shard(len(self._shards), self._store)
+                self._shards.append(shard)
+        return shard
+
+    def samples(self) -> dict[tuple, float]:
+        totals: dict[tuple, float] = {}
+        if self.multiprocess_dir:
+            for path in glob(os.path.join(self.multiprocess_dir, "metrics_*.db")):
+                for key, value in MmapStore.read(path):
+                    _, name, labels, part = json.loads(key)
+                    sample = (name, tuple(labels), part)
+                    totals[sample] = totals.get(sample, 0.0) + value
+            return totals
+        for shard in list(self._shards):
+            for key, value in shard.values.copy().items():
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def render(self) -> str:
+        by_metric: dict[str, dict[tuple, dict]] = {}
+        for (name, labels, part), value in self.samples().items():
+            by_metric.setdefault(name, {}).setdefault(labels, {})[part] = value
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for labels, parts in sorted(by_metric.get(metric.name, {}).items()):
+                if not isinstance(metric, Histogram):
+                    lines.append(f"{metric.name}{_labels(metric.labelnames, labels)} {_number(parts[''])}")
+                    continue
+                cumulative = 0.0
+                for index, bound in enumerate((*metric.buckets, "+Inf")):
+                    cumulative += parts.get(index, 0.0)
+                    le = f'le="{bound}"'
+                    lines.append(f"{metric.name}_bucket{_labels(metric.labelnames, labels, le)} {_number(cumulative)}")
+                lines.append(f"{metric.name}_sum{_labels(metric.labelnames, labels)} {_number(parts.get('sum', 0.0))}")
+                lines.append(f"{metric.name}_count{_labels(metric.labelnames, labels)} {_number(parts.get('count', 0.0))}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry(settings.metrics_multiprocess_dir)
+
+http_requests = registry.counter(
+    "bookit_http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "bookit_http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+http_requests_in_flight = registry.gauge("bookit_http_requests_in_flight", "HTTP requests being served")
+db_request_duration = registry.histogram(
+    "bookit_db_request_duration_seconds", "Time spent in SQL statements per HTTP request", ("route",)
+)
+db_queries = registry.counter("bookit_db_queries_total", "SQL statements issued by HTTP requests", ("route",))
+cache_lookups = registry.counter("bookit_cache_lookups_total", "In-process cache lookups by result", ("cache", "result"))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware feeding the HTTP and per-request database metrics.
+
+    Must run inside RequestLoggingMiddleware, which opens the SQL statement
+    tracking this reads.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter_ns()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            # FastAPI stores the matched route in the scope; its path is the template
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            http_requests.inc(method, route, str(status_code))
+            http_request_duration.observe((perf_counter_ns() - start) / 1e9, method, route)
+            queries = current_query_stats()
+            if queries is not None:
+                db_queries.inc(route, amount=queries.count)
+                db_request_duration.observe(queries.duration_ms / 1000, route)
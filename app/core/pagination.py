@@ -0,0 +1,25 @@
+import base64
+import json
+from typing import Any, Callable
+from fastapi import HTTPException
+from app.core.config import settings
+
+def clamp_limit(limit: int) -> int:
+    """Apply the server-side page size cap."""
+    return max(1, min(limit, settings.page_size_max))
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque keyset cursor over the sort key of the last row of a page."""
+    raw = json.dumps([str(value) for value in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *parsers: Callable[[str], Any]) -> tuple:
+    """Decode a cursor from encode_cursor, converting each value with the matching parser."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if len(values) != len(parsers):
+            raise ValueError("cursor has the wrong number of values")
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
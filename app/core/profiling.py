@@ -0,0 +1,196 @@
+import functools
+import os
+import sys
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from time import perf_counter_ns
+from types import CodeType, FrameType
+from typing import Callable
+from uuid import uuid4
+from fastapi import HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.dependencies import resolve_dependency
+
+PROFILE_HEADER = b"x-profile"
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _label(code: CodeType) -> str:
+    filename = code.co_filename
+    if filename.startswith(_PROJECT_ROOT):
+        filename = os.path.relpath(filename, _PROJECT_ROOT)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+class RequestProfile:
+    """Stack samples of one request, taken by a sampler thread every `interval` seconds.
+
+    A thread's stack is sampled only while it runs the request's code: above
+    the middleware's frame on the event loop thread, or above a frame entered
+    through bind() on a thread pool worker (or in the greenlet of
+    AsyncSession.run_sync). Time a coroutine spends awaiting is not sampled.
+    """
+
+    def __init__(self, method: str, path: str, interval: float):
+        self.id = uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.started_at = datetime.now(timezone.utc)
+        self.status_code: int | None = None
+        self.duration_ms = 0.0
+        self.stacks: Counter[tuple[CodeType, ...]] = Counter()
+        self._roots: dict[int, list[FrameType]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name=f"profiler-{self.id}", daemon=True)
+        self._start = 0
+
+    def start(self, root: FrameType | None = None) -> None:
+        if root is not None:
+            self._enter(root)
+        self._start = perf_counter_ns()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration_ms = (perf_counter_ns() - self._start) / 1e6
+        self._roots.clear()
+
+    def bind(self, fn: Callable) -> Callable:
+        """Wrap `fn` so that its thread is sampled while it runs."""
+
+        @functools.wraps(fn)
+        def bound(*args, **kwargs):
+            frame = sys._getframe()
+            self._enter(frame)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._exit(frame)
+
+        return bound
+
+    def _enter(self, frame: FrameType) -> None:
+        with self._lock:
+            self._roots.setdefault(threading.get_ident(), []).append(frame)
+
+    def _exit(self, frame: FrameType) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            roots = self._roots.get(ident)
+            if roots is not None:
+                roots.remove(frame)
+                if not roots:
+                    del self._roots[ident]
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                threads = [(ident, list(roots)) for ident, roots in self._roots.items()]
+            for ident, roots in threads:
+                frame, stack = frames.get(ident), []
+                while frame is not None and not any(frame is root for root in roots):
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                # No root below: the thread is busy with another request (or idle)
+                if frame is not None and stack:
+                    self.stacks[tuple(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Samples in collapsed stack format (`outer;inner count` per line), for flamegraph.pl or speedscope."""
+        return "".join(
+            ";".join(_label(code) for code in stack) + f" {count}\n" for stack, count in self.stacks.most_common()
+        )
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": self.status_code,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "interval_ms": self.interval * 1000,
+            "samples": sum(self.stacks.values()),
+        }
+
+
+_current: ContextVar[RequestProfile | None] = ContextVar("request_profile", default=None)
+_profiles: deque[RequestProfile] = deque(maxlen=settings.profile_history)
+
+
+def current_profile() -> RequestProfile | None:
+    return _current.get()
+
+
+def recent_profiles() -> list[RequestProfile]:
+    """Finished profiles, newest first."""
+    return list(reversed(_profiles))
+
+
+def find_profile(profile_id: str) -> RequestProfile | None:
+    return next((profile for profile in list(_profiles) if profile.id == profile_id), None)
+
+
+def _requested(scope: Scope) -> bool:
+    return any(name == PROFILE_HEADER and value == b"1" for name, value in scope["headers"])
+
+
+async def _is_admin(request: Request) -> bool:
+    """Whether the request passes the admin check of the /admin routes."""
+    # Imported here: app.services imports app.db.session, which imports this module
+    from app.services.security import require_admin
+
+    try:
+        await resolve_dependency(request, require_admin)
+    except (HTTPException, RequestValidationError):
+        return False
+    return True
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware profiling the requests an admin sends with `X-Profile: 1`.
+
+    Anyone else's requests are served as usual, unprofiled. The profile id
+    comes back in the X-Profile-Id header; the last PROFILE_HISTORY profiles
+    are served under /admin/profiles. Must run inside any BaseHTTPMiddleware,
+    whose call_next moves the rest of the request to another task, out of
+    this middleware's stack.
+    """
+
+    def __init__(self, app: ASGIApp, interval_ms: float = 1.0):
+        self.app = app
+        self.interval = interval_ms / 1000
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # From anyone but an admin the header is ignored
+        if scope["type"] != "http" or not _requested(scope) or not await _is_admin(Request(scope, receive)):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], self.interval)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+            await send(message)
+
+        token = _current.set(profile)
+        profile.start(sys._getframe())
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.stop()
+            _current.reset(token)
+            _profiles.append(profile)
@@ -0,0 +1,164 @@
+import functools
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import Callable, Iterator
+from fastapi.routing import APIRoute
+
+
+class RequestTiming:
+    """Total duration and count per span name for one request."""
+
+    __slots__ = ("spans", "active", "endpoint_end")
+
+    def __init__(self):
+        self.spans: dict[str, list] = {}
+        self.active: set[str] = set()
+        self.endpoint_end = 0
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [elapsed_ms, 1]
+        else:
+            entry[0] += elapsed_ms
+            entry[1] += 1
+
+    def server_timing(self) -> str:
+        """Server-Timing header entries, e.g. `auth;dur=0.8, booking_insert;dur=3.1`."""
+        return ", ".join(f"{name};dur={total:.1f}" for name, (total, _) in self.spans.items())
+
+    def breakdown(self) -> dict[str, float]:
+        return {name: round(total, 3) for name, (total, _) in self.spans.items()}
+
+
+_current: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+
+
+@contextmanager
+def track_timing() -> Iterator[RequestTiming]:
+    """Collect the spans of this context (and tasks/threads spawned from it) in a fresh RequestTiming."""
+    timing = RequestTiming()
+    token = _current.set(timing)
+    try:
+        yield timing
+    finally:
+        _current.reset(token)
+
+
+def current_timing() -> RequestTiming | None:
+    return _current.get()
+
+
+class _Span:
+    __slots__ = ("timing", "name", "start")
+
+    def __init__(self, timing: RequestTiming, name: str):
+        self.timing = timing
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter_ns()
+        self.timing.active.add(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timing.active.discard(self.name)
+        self.timing.add(self.name, (perf_counter_ns() - self.start) / 1e6)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """`with span("name"):` adds the block's duration to the request's `name` span.
+
+    Outside a timed request, or inside an enclosing span of the same name
+    (e.g. one timed dependency calling another), it does nothing.
+    """
+    timing = _current.get()
+    if timing is None or name in timing.active:
+        return _NO_SPAN
+    return _Span(timing, name)
+
+
+def timed(name: str) -> Callable:
+    """Decorator running a sync or async function inside span(name)."""
+
+    def decorate(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def _mark_endpoint_end() -> None:
+    timing = _current.get()
+    if timing is not None:
+        timing.endpoint_end = perf_counter_ns()
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # include_router() builds the route again from the already wrapped endpoint
+    if getattr(endpoint, "_timed_endpoint", False):
+        return endpoint
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_endpoint(*args, **kwargs):
+            with span("endpoint"):
+                result = await endpoint(*args, **kwargs)
+            _mark_endpoint_end()
+            return result
+        async_endpoint._timed_endpoint = True
+        return async_endpoint
+
+    @functools.wraps(endpoint)
+    def sync_endpoint(*args, **kwargs):
+        with span("endpoint"):
+            result = endpoint(*args, **kwargs)
+        _mark_endpoint_end()
+        return result
+    sync_endpoint._timed_endpoint = True
+    return sync_endpoint
+
+
+class TimedRoute(APIRoute):
+    """APIRoute adding two spans: `endpoint` (the path operation function) and
+    `response` (FastAPI's response_model validation and rendering after it)."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timing = _current.get()
+            if timing is not None and timing.endpoint_end:
+                timing.add("response", (perf_counter_ns() - timing.endpoint_end) / 1e6)
+            return response
+
+        return timed_handler
@@ -1,11 +1,38 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Float, Boolean, DateTime, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Float, Boolean, DateTime, Computed, DDL, event, func, text
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.dialects.postgresql import UUID, TSRANGE, TSVECTOR, ExcludeConstraint
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 from .base import Base
 from datetime import datetime, timezone
 from enum import Enum
 
+# Extensions required by the constraints and indexes below when the schema is
+# built with Base.metadata.create_all (migrations create them explicitly)
+for extension in ("btree_gist", "pg_trgm"):
+    event.listen(
+        Base.metadata,
+        "before_create",
+        DDL(f"CREATE EXTENSION IF NOT EXISTS {extension}").execute_if(dialect="postgresql"),
+    )
+
+class NaiveUTCDateTime(TypeDecorator):
+    """TIMESTAMP WITHOUT TIME ZONE holding UTC; aware values are converted on the way in.
+
+    psycopg2 leaves converting aware values to the server's session time zone;
+    asyncpg rejects them outright.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+# Booking statuses that hold their time slot
+ACTIVE_BOOKING_STATUSES = ("pending", "confirmed")
+
 class UserRole(str, Enum):
     ADMIN = "admin"
     USER = "user"
@@ -18,13 +45,51 @@ class User(Base):
     email = Column(String(255), unique=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     role = Column(String(50), nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(NaiveUTCDateTime, default=lambda: datetime.now(timezone.utc))
+    # Carried in access tokens as "ver"; bumping it invalidates every token issued before
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Add relationships
     reviews = relationship("Review", back_populates="user")
 
+# Tokens carry the role as a claim, so a role change must retire them. A trigger
+# (also created by migration 5a0e6c2f9d13) covers every path, including the
+# plain UPDATE used to promote or demote admins.
+event.listen(
+    User.__table__,
+    "after_create",
+    DDL("""
+        CREATE OR REPLACE FUNCTION users_bump_token_version() RETURNS trigger AS $$
+        BEGIN
+            NEW.token_version := OLD.token_version + 1;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """).execute_if(dialect="postgresql"),
+)
+event.listen(
+    User.__table__,
+    "after_create",
+    DDL("""
+        CREATE TRIGGER trg_users_role_token_version
+        BEFORE UPDATE OF role ON users
+        FOR EACH ROW WHEN (OLD.role IS DISTINCT FROM NEW.role)
+        EXECUTE FUNCTION users_bump_token_version()
+    """).execute_if(dialect="postgresql"),
+)
+
 class Service(Base):
     __tablename__ = "services"
+    __table_args__ = (
+        # Full-text search over name/description, plus trigram matching on name
+        Index("ix_services_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_services_name_trgm", "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index("ix_services_rating_average", text("rating_average DESC NULLS LAST")),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String, nullable=False)
@@ -33,19 +98,64 @@ class Service(Base):
     duration_minutes = Column(Integer, nullable=False)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), default=func.now())
+    search_vector = Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+        persisted=True,
+    ))
+    
+    # Review aggregates, maintained by app/services/review.py in the same
+    # transaction as each review write (rating_1..rating_5 is the histogram)
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_1 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_2 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_3 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_4 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_5 = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_average = Column(Float, Computed(
+        "CASE WHEN rating_count > 0 THEN rating_sum::float8 / rating_count END",
+        persisted=True,
+    ))
     
     # Add relationship to bookings
     bookings = relationship("Booking", back_populates="service")
+    
+    @property
+    def rating_histogram(self) -> list[int]:
+        """Review counts for ratings 1 through 5."""
+        return [self.rating_1 or 0, self.rating_2 or 0, self.rating_3 or 0, self.rating_4 or 0, self.rating_5 or 0]
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Postgres rejects overlapping active bookings for the same service
+        ExcludeConstraint(
+            ("service_id", "="),
+            ("during", "&&"),
+            name="ex_bookings_service_overlap",
+            using="gist",
+            where=text("status IN ('pending', 'confirmed')"),
+        ),
+        # Active bookings of a service in a time window (conflict checks, availability)
+        Index(
+            "ix_bookings_service_active_window",
+            "service_id", "start_time", "end_time",
+            postgresql_where=text("status IN ('pending', 'confirmed')"),
+        ),
+        Index("ix_bookings_user_start", "user_id", "start_time"),
+        # All bookings of a service, whatever their status (service review listings)
+        Index("ix_bookings_service_id", "service_id"),
+        Index("ix_bookings_status_start", "status", "start_time"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     service_id = Column(UUID(as_uuid=True), ForeignKey("services.id"))
-    start_time = Column(DateTime, nullable=False)
-    end_time = Column(DateTime, nullable=False)
+    start_time = Column(NaiveUTCDateTime, nullable=False)
+    end_time = Column(NaiveUTCDateTime, nullable=False)
     status = Column(String(50), nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(NaiveUTCDateTime, default=lambda: datetime.now(timezone.utc))
+    during = Column(TSRANGE, Computed("tsrange(start_time, end_time, '[)')", persisted=True))
     
     # Add relationships
     service = relationship("Service", back_populates="bookings")
@@ -53,13 +163,30 @@ class Booking(Base):
 
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        Index("ix_reviews_booking_id", "booking_id", unique=True),
+        Index("ix_reviews_user_id", "user_id"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.id"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     rating = Column(Integer, nullable=False)
     comment = Column(String)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(NaiveUTCDateTime, default=lambda: datetime.now(timezone.utc))
     
     # Add relationships
     booking = relationship("Booking", back_populates="reviews")
-    user = relationship("User", back_populates="reviews")
\ No newline at end of file
+    user = relationship("User", back_populates="reviews")
+
+
+class RevokedToken(Base):
+    """A revoked JWT, kept until the token would have expired anyway."""
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_revoked_at", "revoked_at"),
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(NaiveUTCDateTime, nullable=False)
+    # Compared against the sync watermark of each worker's RevocationStore
+    revoked_at = Column(NaiveUTCDateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
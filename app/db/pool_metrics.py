@@ -0,0 +1,101 @@
+import threading
+import time
+from bisect import bisect_left
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is +Inf
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """Checkout counters and wait-time histogram of one connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Pool | None = None
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def observe_wait(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.wait_buckets[bisect_left(WAIT_BUCKETS_MS, elapsed_ms)] += 1
+            self.wait_total_ms += elapsed_ms
+            self.wait_max_ms = max(self.wait_max_ms, elapsed_ms)
+
+    def count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def attach(self, pool: Pool) -> None:
+        """Listen to `pool`'s lifecycle events (called for every pool the engine creates)."""
+        self.pool = pool
+        event.listen(pool, "connect", lambda *_: self.count("connects"))
+        event.listen(pool, "checkout", lambda *_: self.count("checkouts"))
+        event.listen(pool, "checkin", lambda *_: self.count("checkins"))
+        event.listen(pool, "invalidate", lambda *_: self.count("invalidations"))
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        waits = sum(self.wait_buckets)
+        cumulative, histogram = 0, {}
+        for bound, count in zip((*WAIT_BUCKETS_MS, "+Inf"), self.wait_buckets):
+            cumulative += count
+            histogram[f"le_{bound}"] = cumulative
+        return {
+            "pool": type(pool).__bases__[0].__name__ if pool else None,
+            "size": pool.size() if pool else None,
+            "checked_in": pool.checkedin() if pool else None,
+            "checked_out": pool.checkedout() if pool else None,
+            "overflow": pool.overflow() if pool else None,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "wait_ms": {
+                "count": waits,
+                "mean": self.wait_total_ms / waits if waits else 0.0,
+                "max": self.wait_max_ms,
+                "histogram": histogram,
+            },
+        }
+
+
+def instrumented_pool_class(base: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    """Subclass of the QueuePool flavour `base` that times every connection checkout.
+
+    The time covers waiting for a free slot, opening overflow connections and
+    the pre-ping, i.e. everything a request waits for before its first query.
+    Pools recreated by engine.dispose() use the same class, so they keep
+    reporting to `metrics`.
+    """
+
+    class InstrumentedPool(base):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            metrics.attach(self)
+
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                return super().connect()
+            except exc.TimeoutError:
+                metrics.count("timeouts")
+                raise
+            finally:
+                metrics.observe_wait((time.perf_counter() - start) * 1000)
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+# One per engine, reported by GET /admin/db/pool
+pool_metrics: dict[str, PoolMetrics] = {}
@@ -0,0 +1,135 @@
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import Callable
+from fastapi import Request
+from jose import JWTError, jwt
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Set on responses to successful writes; until the timestamp it holds passes,
+# get_read_db sends that client's reads to the primary.
+READ_YOUR_WRITES_COOKIE = "bookit_primary_until"
+UNSAFE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Users (JWT "sub") who wrote within READ_YOUR_WRITES_SECONDS, for bearer token
+# clients that keep no cookies. Per worker: a cookie-less client whose next
+# request lands on another worker reads from a replica again.
+recent_writers = TTLCache(
+    "recent_writers",
+    maxsize=settings.user_cache_max_entries,
+    ttl=settings.read_your_writes_seconds,
+)
+
+
+class ReplicaSet:
+    """Round-robin choice among read replicas, skipping ones that recently failed.
+
+    A replica is marked down when a connection to it cannot be opened; it is
+    skipped for `retry_after` seconds and then tried again.
+    """
+
+    def __init__(self, names: list[str], session_factories: list[Callable], retry_after: float):
+        self.names = names
+        self.session_factories = session_factories
+        self.retry_after = retry_after
+        self.reads = [0] * len(names)
+        self.failures = [0] * len(names)
+        self._down_until = [0.0] * len(names)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def candidates(self) -> list[int]:
+        """Indexes of the healthy replicas, starting with the next one in turn."""
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.names) if self.names else 0
+        now = time.monotonic()
+        order = [(start + offset) % len(self.names) for offset in range(len(self.names))]
+        return [index for index in order if self._down_until[index] <= now]
+
+    def mark_up(self, index: int) -> None:
+        with self._lock:
+            self.reads[index] += 1
+            self._down_until[index] = 0.0
+
+    def mark_down(self, index: int) -> None:
+        with self._lock:
+            self.failures[index] += 1
+            self._down_until[index] = time.monotonic() + self.retry_after
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "name": name,
+                    "healthy": self._down_until[index] <= now,
+                    "reads": self.reads[index],
+                    "failures": self.failures[index],
+                }
+                for index, name in enumerate(self.names)
+            ]
+
+
+def _token_subject(headers: Headers) -> str | None:
+    """The bearer token's "sub", unverified: it only picks the database to read from."""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return jwt.get_unverified_claims(token).get("sub")
+    except JWTError:
+        return None
+
+
+def wants_primary(request: Request) -> bool:
+    """True while the client, by its user or its cookie, is inside its read-your-writes window."""
+    subject = _token_subject(request.headers)
+    if subject is not None and recent_writers.get(subject) is not None:
+        return True
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware pinning a client's reads to the primary for a while after it writes.
+
+    The window is kept for the authenticated user (see recent_writers) and in
+    a cookie, for browsers and anonymous clients.
+    """
+
+    def __init__(self, app: ASGIApp, window_seconds: float):
+        self.app = app
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in UNSAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                subject = _token_subject(Headers(scope=scope))
+                if subject is not None:
+                    recent_writers.set(subject, True)
+                MutableHeaders(scope=message).append("set-cookie", self._cookie())
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _cookie(self) -> str:
+        cookie = SimpleCookie()
+        cookie[READ_YOUR_WRITES_COOKIE] = f"{time.time() + self.window_seconds:.3f}"
+        cookie[READ_YOUR_WRITES_COOKIE]["max-age"] = max(1, int(self.window_seconds + 0.999))
+        cookie[READ_YOUR_WRITES_COOKIE]["path"] = "/"
+        cookie[READ_YOUR_WRITES_COOKIE]["httponly"] = True
+        cookie[READ_YOUR_WRITES_COOKIE]["samesite"] = "lax"
+        return cookie.output(header="").strip()
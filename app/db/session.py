@@ -1,17 +1,60 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Iterator
+from fastapi import Request
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from sqlalchemy import create_engine, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from contextlib import contextmanager
 from app.core.config import settings
+from app.core.profiling import current_profile
+from app.db.pool_metrics import PoolMetrics, instrumented_pool_class, pool_metrics
+from app.db.replicas import ReplicaSet, wants_primary
+
+def _engine_options(name: str, pool_class, connect_args: dict) -> dict:
+    metrics = pool_metrics[name] = PoolMetrics(name)
+    return {
+        "poolclass": instrumented_pool_class(pool_class, metrics),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+def _sync_connect_args() -> dict:
+    if not settings.db_statement_timeout_ms:
+        return {}
+    return {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+
+def _async_connect_args() -> dict:
+    if not settings.db_statement_timeout_ms:
+        return {}
+    return {"server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)}}
 
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
-    pool_recycle=300,
+    **_engine_options("primary", QueuePool, _sync_connect_args()),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def get_db():
+# asyncpg engine, only created when selected (DB_BACKEND=async). Objects stay
+# loaded after commit because routers serialize them outside the session's greenlet.
+async_engine = None
+AsyncSessionLocal = None
+if settings.db_backend == "async":
+    async_engine = create_async_engine(
+        settings.get_async_db_url(),
+        **_engine_options("primary_async", AsyncAdaptedQueuePool, _async_connect_args()),
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
@@ -20,6 +63,117 @@ def get_db():
             db.rollback()
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Request dependency: a Session or an AsyncSession depending on DB_BACKEND.
+# Handlers pass it to run_db()/iterate_db() rather than querying directly.
+get_db = get_async_db if settings.db_backend == "async" else get_sync_db
+
+def _replica_engine(index: int, url: str):
+    name = f"replica_{index}"
+    if settings.db_backend == "async":
+        return create_async_engine(
+            settings.get_async_db_url(url),
+            **_engine_options(name, AsyncAdaptedQueuePool, _async_connect_args()),
+        )
+    return create_engine(url, **_engine_options(name, QueuePool, _sync_connect_args()))
+
+def _replica_session_factory(replica_engine):
+    if settings.db_backend == "async":
+        return async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)
+    return sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+replica_engines = [_replica_engine(index, url) for index, url in enumerate(settings.replica_database_url)]
+replicas = ReplicaSet(
+    [f"replica_{index}" for index in range(len(replica_engines))],
+    [_replica_session_factory(replica_engine) for replica_engine in replica_engines],
+    retry_after=settings.replica_retry_seconds,
+)
+
+# Connection failures that send a request to the next replica (or the primary)
+REPLICA_ERRORS = (exc.DBAPIError, exc.TimeoutError, OSError)
+
+def get_sync_read_db(request: Request):
+    if replicas and not wants_primary(request):
+        for index in replicas.candidates():
+            db = replicas.session_factories[index]()
+            try:
+                # Check out a connection now (pre-pinged) so a dead replica is caught here
+                db.connection()
+            except REPLICA_ERRORS:
+                db.close()
+                replicas.mark_down(index)
+                continue
+            replicas.mark_up(index)
+            try:
+                yield db
+            finally:
+                db.rollback()
+                db.close()
+            return
+    yield from get_sync_db()
+
+async def get_async_read_db(request: Request):
+    if replicas and not wants_primary(request):
+        for index in replicas.candidates():
+            db = replicas.session_factories[index]()
+            try:
+                await db.connection()
+            except REPLICA_ERRORS:
+                await db.close()
+                replicas.mark_down(index)
+                continue
+            replicas.mark_up(index)
+            try:
+                yield db
+            finally:
+                await db.close()
+            return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Request dependency for read-only endpoints: a session on the next healthy
+# replica, or on the primary when no replica is configured or reachable, or
+# while the client is inside its read-your-writes window.
+get_read_db = get_async_read_db if settings.db_backend == "async" else get_sync_read_db
+
+async def run_db(db: Session | AsyncSession, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call `fn(session, *args, **kwargs)` without blocking the event loop.
+
+    Repository and service functions are written against the sync Session
+    API. With an AsyncSession they run through run_sync on the asyncpg
+    connection (no thread involved); with a plain Session they go to the
+    thread pool.
+    """
+    profile = current_profile()
+    if profile is not None:
+        # Let the request profiler sample the worker thread (or greenlet) running fn
+        fn = profile.bind(fn)
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: fn(session, *args, **kwargs))
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+async def iterate_db(
+    db: Session | AsyncSession,
+    fn: Callable[..., Iterator],
+    *args,
+    chunk_size: int = 100,
+) -> AsyncIterator:
+    """Async iterator over the sync generator `fn(session, *args)`, for streaming responses."""
+    if not isinstance(db, AsyncSession):
+        async for item in iterate_in_threadpool(fn(db, *args)):
+            yield item
+        return
+    items = fn(db.sync_session, *args)
+    while True:
+        chunk = await db.run_sync(lambda _: list(islice(items, chunk_size)))
+        if not chunk:
+            return
+        for item in chunk:
+            yield item
+
 @contextmanager
 def session_scope():
     """Provide a transactional scope around a series of operations."""
@@ -31,4 +185,4 @@ def session_scope():
         session.rollback()
         raise
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
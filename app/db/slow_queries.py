@@ -0,0 +1,178 @@
+import hashlib
+import logging
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+import app.db.query_stats  # noqa: F401  (its listener times the statements read below)
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|%s|\$\d+|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+
+def normalize(statement: str) -> str:
+    """Statement text with literals and bind parameters replaced by `?` and IN lists collapsed."""
+    text = _STRING.sub("?", statement)
+    text = _PARAM.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _IN_LIST.sub("IN (...)", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+def seq_scans(plan) -> list[str]:
+    """Relations read by a Seq Scan anywhere in an EXPLAIN (FORMAT JSON) plan."""
+    found, nodes = set(), [entry["Plan"] for entry in plan or []]
+    while nodes:
+        node = nodes.pop()
+        if node.get("Node Type") == "Seq Scan":
+            found.add(node.get("Relation Name"))
+        nodes.extend(node.get("Plans", []))
+    return sorted(found)
+
+
+class SlowQuery:
+    def __init__(self, fingerprint: str, statement: str):
+        self.fingerprint = fingerprint
+        self.statement = statement
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_seen: datetime | None = None
+        self.plan = None
+        self.plan_error: str | None = None
+
+    def snapshot(self) -> dict:
+        return {
+            "fingerprint": self.fingerprint,
+            "statement": self.statement,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_seen": self.last_seen.isoformat() if self.last_seen else None,
+            "seq_scans": seq_scans(self.plan),
+            "plan": self.plan,
+            "plan_error": self.plan_error,
+        }
+
+
+class SlowQueryLog:
+    """Top-N statement fingerprints by total time, among executions slower than `threshold_ms`.
+
+    The first slow execution of a fingerprint queues an EXPLAIN (FORMAT JSON)
+    of that statement, with its parameters, on a background thread using a
+    connection of its own. Only psycopg2 statements are explained: asyncpg
+    ones use $n placeholders the sync engine cannot bind. When the table is
+    full a new fingerprint replaces the entry with the smallest total time,
+    if it is already slower than that.
+    """
+
+    def __init__(self, threshold_ms: float, top_n: int, explain: bool):
+        self.threshold_ms = threshold_ms
+        self.top_n = top_n
+        self.explain = explain
+        self.dropped = 0
+        self._entries: dict[str, SlowQuery] = {}
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: set[Future] = set()
+
+    def observe(self, statement: str, parameters, elapsed_ms: float, driver: str) -> None:
+        if not self.threshold_ms or elapsed_ms < self.threshold_ms or statement.lstrip()[:7].upper() == "EXPLAIN":
+            return
+        normalized = normalize(statement)
+        key = fingerprint(normalized)
+        with self._lock:
+            entry = self._entries.get(key)
+            is_new = entry is None
+            if is_new:
+                if len(self._entries) >= self.top_n:
+                    smallest = min(self._entries.values(), key=lambda item: item.total_ms)
+                    if smallest.total_ms >= elapsed_ms:
+                        self.dropped += 1
+                        return
+                    del self._entries[smallest.fingerprint]
+                entry = self._entries[key] = SlowQuery(key, normalized)
+            entry.calls += 1
+            entry.total_ms += elapsed_ms
+            entry.max_ms = max(entry.max_ms, elapsed_ms)
+            entry.last_seen = datetime.now(timezone.utc)
+        if is_new:
+            logger.warning("slow query %s (%.1f ms): %s", key, elapsed_ms, normalized[:200])
+            self._queue_explain(entry, statement, parameters, driver)
+
+    def _queue_explain(self, entry: SlowQuery, statement: str, parameters, driver: str) -> None:
+        if not self.explain:
+            return
+        if driver != "psycopg2":
+            entry.plan_error = f"EXPLAIN is only captured for psycopg2 statements (got {driver})"
+            return
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            entry.plan_error = "statement cannot be explained"
+            return
+        if isinstance(parameters, list):  # executemany: the first row is representative
+            parameters = parameters[0] if parameters else None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        future = self._executor.submit(self._explain, entry, statement, parameters)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+    def _explain(self, entry: SlowQuery, statement: str, parameters) -> None:
+        from app.db.session import engine
+
+        try:
+            with engine.connect() as conn:
+                entry.plan = conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE off, FORMAT JSON) {statement}", parameters or {}
+                ).scalar()
+            scans = seq_scans(entry.plan)
+            if scans:
+                logger.warning("slow query %s plans a seq scan on %s", entry.fingerprint, ", ".join(scans))
+        except Exception as e:
+            entry.plan_error = str(e).strip().splitlines()[0]
+
+    def wait_for_plans(self, timeout: float | None = None) -> None:
+        """Block until the queued EXPLAINs have finished (for tests and scripts)."""
+        wait(list(self._pending), timeout=timeout)
+
+    def entries(self) -> list[dict]:
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda item: item.total_ms, reverse=True)
+        return [entry.snapshot() for entry in entries]
+
+    def clear(self) -> None:
+        """Forget every fingerprint, so their plans are captured again on the next slow run."""
+        with self._lock:
+            self._entries.clear()
+            self.dropped = 0
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.slow_query_ms,
+    top_n=settings.slow_query_top_n,
+    explain=settings.slow_query_explain,
+)
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    slow_query_log.observe(statement, parameters, context._query_ms, conn.dialect.driver)
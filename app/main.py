@@ -1,10 +1,18 @@
+import asyncio
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.logging import log_requests
+from app.core.config import settings
+from app.core.logging import RequestLoggingMiddleware, start_request_logging, stop_request_logging
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.loop_watchdog import loop_watchdog
 from app.core.admin import create_default_admin
-from app.api.routers import auth, user, book_service, booking, reviews
-from app.db.session import get_db, engine
+from app.api.routers import auth, user, book_service, booking, reviews, admin, metrics
+from app.db.session import get_db, engine, async_engine, replica_engines
+from app.db.replicas import ReadYourWritesMiddleware
+from app.db.slow_queries import slow_query_log
 from app.db.base import Base
+from app.services.security import shutdown_hash_executor
 
 # Create tables if they don't exist
 Base.metadata.create_all(bind=engine)
@@ -63,6 +71,10 @@ app = FastAPI(
         {
             "name": "reviews",
             "description": "Review management - create and manage reviews for completed bookings"
+        },
+        {
+            "name": "admin",
+            "description": "Operational introspection - cache counters and runtime diagnostics (admin only)"
         }
     ]
 )
@@ -76,8 +88,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add logging middleware
-app.middleware("http")(log_requests)
+# Add profiling, metrics and logging middleware (logging wraps metrics: it opens the per-request SQL tracking)
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware, interval_ms=settings.profile_interval_ms)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(
+    RequestLoggingMiddleware,
+    sample_2xx=settings.request_log_sample_2xx,
+    sample_queue_fill=settings.request_log_sample_queue_fill,
+)
+
+# Keep a client's reads on the primary for a moment after it writes
+if settings.replica_database_url:
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=settings.read_your_writes_seconds)
 
 # Include routers
 app.include_router(auth.router)
@@ -85,13 +109,32 @@ app.include_router(user.router)
 app.include_router(book_service.router)
 app.include_router(booking.router)
 app.include_router(reviews.router)
+app.include_router(admin.router)
+if settings.metrics_enabled:
+    app.include_router(metrics.router)
 
 @app.on_event("startup")
 async def startup_event():
-    """Create default admin user on startup if none exists."""
+    """Start the request log writer and loop watchdog, and create the default admin user if none exists."""
+    start_request_logging()
+    if settings.loop_watchdog_enabled:
+        loop_watchdog.start(asyncio.get_running_loop())
     create_default_admin()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the loop watchdog, release the password hashing and EXPLAIN executors and the asyncpg pools, then flush the request log."""
+    loop_watchdog.stop()
+    shutdown_hash_executor()
+    slow_query_log.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+        for replica_engine in replica_engines:
+            await replica_engine.dispose()
+    stop_request_logging()
+
+
 @app.get("/", tags=["root"])
 async def read_root():
     """
@@ -1,9 +1,11 @@
 from sqlalchemy.orm import Session
+from app.core.timing import timed
 from app.db import models
 from app.schemas.booking import BookingCreate
 from datetime import datetime
 from uuid import UUID
 
+@timed("booking_insert")
 def create_booking(db: Session, booking: BookingCreate, user_id: UUID | str):
     db_booking = models.Booking(
         user_id=user_id,
@@ -17,6 +19,32 @@ def create_booking(db: Session, booking: BookingCreate, user_id: UUID | str):
     db.refresh(db_booking)
     return db_booking
 
+def get_active_intervals(db: Session, service_id: UUID, start: datetime, end: datetime):
+    """Return (start_time, end_time) of active bookings overlapping [start, end), ordered by start."""
+    return (
+        db.query(models.Booking.start_time, models.Booking.end_time)
+        .filter(
+            models.Booking.service_id == service_id,
+            models.Booking.status.in_(models.ACTIVE_BOOKING_STATUSES),
+            models.Booking.start_time < end,
+            models.Booking.end_time > start,
+        )
+        .order_by(models.Booking.start_time)
+        .all()
+    )
+
+def get_upcoming_active_intervals(db: Session, service_id: UUID, since: datetime):
+    """Return (id, start_time, end_time) of active bookings of a service ending after `since`."""
+    return (
+        db.query(models.Booking.id, models.Booking.start_time, models.Booking.end_time)
+        .filter(
+            models.Booking.service_id == service_id,
+            models.Booking.status.in_(models.ACTIVE_BOOKING_STATUSES),
+            models.Booking.end_time > since,
+        )
+        .all()
+    )
+
 def get_user_bookings(db: Session, user_id: int):
     return db.query(models.Booking).filter(models.Booking.user_id == user_id).all()
 
@@ -1,7 +1,8 @@
+from collections import Counter
+from sqlalchemy import text, tuple_
 from sqlalchemy.orm import Session, joinedload
-from app.db.models import Review, Booking
+from app.db.models import Review, Booking, Service
 from app.schemas.review import ReviewCreate, ReviewUpdate
-from typing import List
 
 def create_review(db: Session, review: ReviewCreate, user_id: str) -> Review:
     db_review = Review(
@@ -11,7 +12,8 @@ def create_review(db: Session, review: ReviewCreate, user_id: str) -> Review:
         comment=review.comment
     )
     db.add(db_review)
-    db.commit()
+    # Flushed, not committed: the caller commits it with the rating aggregates
+    db.flush()
     
     # Reload with relationships
     db_review = (
@@ -28,21 +30,30 @@ def create_review(db: Session, review: ReviewCreate, user_id: str) -> Review:
     return db_review
     return db_review
 
-def get_service_reviews(db: Session, service_id: str) -> List[Review]:
-    reviews = (
-        db.query(Review)
-        .join(Review.booking)
-        .options(joinedload(Review.booking).joinedload(Booking.service))
+def get_service_review_rows(
+    db: Session,
+    service_id,
+    limit: int,
+    sort: str = "recent",
+    after: tuple | None = None
+) -> list:
+    """Review columns of a service, newest (or highest rated) first.
+
+    Selects only the columns of ReviewSummary; `after` is the sort key of the
+    previous page's last row: (created_at, id), or (rating, created_at, id)
+    when sorting by rating.
+    """
+    key = [Review.created_at, Review.id]
+    if sort == "rating":
+        key.insert(0, Review.rating)
+    query = (
+        db.query(Review.id, Review.booking_id, Review.user_id, Review.rating, Review.comment, Review.created_at)
+        .join(Booking, Booking.id == Review.booking_id)
         .filter(Booking.service_id == service_id)
-        .all()
     )
-    
-    # Ensure service is assigned from the booking
-    for review in reviews:
-        if review.booking and review.booking.service:
-            review.service = review.booking.service
-    
-    return reviews
+    if after is not None:
+        query = query.filter(tuple_(*key) < after)
+    return query.order_by(*(column.desc() for column in key)).limit(limit).all()
 
 def update_review(db: Session, review_id: str, review_in: ReviewUpdate) -> Review | None:
     review = db.query(Review).filter(Review.id == review_id).first()
@@ -60,4 +71,66 @@ def delete_review(db: Session, review_id: str) -> bool:
         return False
     db.delete(review)
     db.commit()
-    return True
\ No newline at end of file
+    return True
+
+def adjust_service_rating(
+    db: Session,
+    service_id,
+    added: int | None = None,
+    removed: int | None = None
+) -> None:
+    """Add and/or remove one rating from a service's aggregates.
+
+    Issues an in-place UPDATE without committing, so the caller's next commit
+    applies it atomically with the review write.
+    """
+    histogram = Counter()
+    if added is not None:
+        histogram[added] += 1
+    if removed is not None:
+        histogram[removed] -= 1
+    values = {
+        Service.rating_count: Service.rating_count + sum(histogram.values()),
+        Service.rating_sum: Service.rating_sum + (added or 0) - (removed or 0),
+    }
+    for rating, delta in histogram.items():
+        if delta:
+            column = getattr(Service, f"rating_{rating}")
+            values[column] = column + delta
+    db.query(Service).filter(Service.id == service_id).update(values, synchronize_session=False)
+
+RECONCILE_RATINGS_SQL = text("""
+    UPDATE services s SET
+        rating_count = coalesce(a.rating_count, 0),
+        rating_sum = coalesce(a.rating_sum, 0),
+        rating_1 = coalesce(a.rating_1, 0),
+        rating_2 = coalesce(a.rating_2, 0),
+        rating_3 = coalesce(a.rating_3, 0),
+        rating_4 = coalesce(a.rating_4, 0),
+        rating_5 = coalesce(a.rating_5, 0)
+    FROM services t
+    LEFT JOIN (
+        SELECT b.service_id,
+               count(*) AS rating_count,
+               sum(r.rating) AS rating_sum,
+               count(*) FILTER (WHERE r.rating = 1) AS rating_1,
+               count(*) FILTER (WHERE r.rating = 2) AS rating_2,
+               count(*) FILTER (WHERE r.rating = 3) AS rating_3,
+               count(*) FILTER (WHERE r.rating = 4) AS rating_4,
+               count(*) FILTER (WHERE r.rating = 5) AS rating_5
+        FROM reviews r JOIN bookings b ON b.id = r.booking_id
+        GROUP BY b.service_id
+    ) a ON a.service_id = t.id
+    WHERE s.id = t.id
+      AND (s.rating_count, s.rating_sum, s.rating_1, s.rating_2, s.rating_3, s.rating_4, s.rating_5)
+          IS DISTINCT FROM
+          (coalesce(a.rating_count, 0), coalesce(a.rating_sum, 0), coalesce(a.rating_1, 0),
+           coalesce(a.rating_2, 0), coalesce(a.rating_3, 0), coalesce(a.rating_4, 0),
+           coalesce(a.rating_5, 0))
+""")
+
+def reconcile_service_ratings(db: Session) -> int:
+    """Recompute every service's rating aggregates from reviews; returns services corrected."""
+    result = db.execute(RECONCILE_RATINGS_SQL)
+    db.commit()
+    return result.rowcount
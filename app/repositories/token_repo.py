@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.db.models import RevokedToken
+
+def revoke_token(db: Session, jti: str, expires_at: datetime) -> None:
+    """Persist a revocation; revoking the same token twice is a no-op."""
+    db.execute(
+        insert(RevokedToken)
+        .values(jti=jti, expires_at=expires_at)
+        .on_conflict_do_nothing(index_elements=["jti"])
+    )
+    db.commit()
+
+def get_revocations_since(db: Session, since: datetime | None, now: datetime) -> list[tuple[str, datetime]]:
+    """(jti, expires_at) of unexpired revocations recorded at or after `since` (all when None)."""
+    query = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(RevokedToken.expires_at > now)
+    if since is not None:
+        query = query.filter(RevokedToken.revoked_at >= since)
+    return query.all()
+
+def delete_expired_revocations(db: Session, now: datetime) -> int:
+    deleted = db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -1,3 +1,6 @@
+import logging
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from app.db import models
@@ -8,7 +11,9 @@ from app.services.security import hash_password
 from fastapi import HTTPException, status
 from typing import Optional
 
-def create_user(db: Session, user: UserCreate) -> User:
+logger = logging.getLogger(__name__)
+
+def create_user(db: Session, user: UserCreate, hashed_password: str | None = None) -> User:
     print(f"\n=== Starting user creation for {user.email} ===")
     
     try:
@@ -23,9 +28,10 @@ def create_user(db: Session, user: UserCreate) -> User:
                 detail="Password is too long. Maximum length is 72 characters."
             )
         
-        # Hash password
+        # Hash password (callers on the event loop pass it pre-hashed)
         try:
-            hashed_password = hash_password(user.password)
+            if hashed_password is None:
+                hashed_password = hash_password(user.password)
             print("Password hashed successfully")
         except Exception as hash_error:
             print(f"Password hashing error: {str(hash_error)}")
@@ -85,6 +91,33 @@ def get_user_by_email(db: Session, email: str) -> Optional[User]:
         )
 
 
+def insert_user_if_new(db: Session, user: UserCreate, hashed_password: str) -> Optional[User]:
+    """Create a user in one INSERT ... ON CONFLICT (email) DO NOTHING RETURNING round trip.
+
+    Returns None when the email is already registered. The new row comes back
+    detached and fully loaded, so reading it after the commit costs no query.
+    """
+    statement = (
+        insert(User)
+        .values(name=user.name, email=user.email, hashed_password=hashed_password, role=UserRole.USER.value)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+    try:
+        db_user = db.scalars(statement).one_or_none()
+        if db_user is not None:
+            db.expunge(db_user)
+        db.commit()
+        return db_user
+    except SQLAlchemyError:
+        db.rollback()
+        logger.exception("database error while registering %s", user.email)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not create user"
+        )
+
+
 def get_user_by_id(db: Session, user_id: UUID) -> Optional[User]:
     """Get a user by ID."""
     try:
@@ -95,4 +128,20 @@ def get_user_by_id(db: Session, user_id: UUID) -> Optional[User]:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+def get_token_version(db: Session, user_id: UUID) -> Optional[int]:
+    """Current token version of a user, or None if the user does not exist."""
+    return db.query(User.token_version).filter(User.id == user_id).scalar()
+
+
+def bump_token_version(db: Session, user_id: UUID) -> Optional[int]:
+    """Invalidate every token issued to the user so far; returns the new version."""
+    version = db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .returning(User.token_version)
+    ).scalar()
+    db.commit()
+    return version
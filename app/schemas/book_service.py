@@ -1,5 +1,5 @@
 # app/schemas/book_service.py
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 from uuid import UUID
 
@@ -16,6 +16,9 @@ class ServiceCreate(ServiceBase):
 class ServiceRead(ServiceBase):
     id: UUID
     created_at: datetime
+    rating_count: int = 0
+    rating_average: float | None = None
+    rating_histogram: list[int] = Field(default_factory=lambda: [0] * 5)  # counts for ratings 1-5
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -25,3 +28,11 @@ class ServiceUpdate(BaseModel):
     price: float | None = None
     duration_minutes: int | None = None
     is_active: bool | None = None
+
+class AvailabilityRead(BaseModel):
+    service_id: UUID
+    window_start: datetime
+    window_end: datetime
+    duration_minutes: int
+    granularity_minutes: int
+    slots: list[datetime]  # start of each open slot of duration_minutes
@@ -33,6 +33,11 @@ class BookingResponse(BookingBase):
     model_config = {"from_attributes": True}
 
 
+class BookingPage(BaseModel):
+    items: list[BookingResponse]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to fetch the next page
+
+
 class BookingUpdate(BaseModel):
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
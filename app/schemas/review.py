@@ -22,4 +22,22 @@ class ReviewRead(ReviewBase):
     created_at: datetime
     service: ServiceRead | None = None
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    model_config = {"from_attributes": True}
+
+
+class ReviewSummary(BaseModel):
+    """A review without its service, for listings that carry the service once."""
+    id: UUID
+    booking_id: UUID
+    user_id: UUID
+    rating: int
+    comment: Optional[str] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ServiceReviewPage(BaseModel):
+    service: ServiceRead
+    items: list[ReviewSummary]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to fetch the next page
@@ -1,20 +1,92 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.db.session import get_db
+from app.core.timing import timed
+from app.db.session import get_db, run_db
 from app.repositories import user_repo
 from app.db.models import User
+from app.services.revocation import revocation_store
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Detached, read-only copy of the User fields request handlers rely on."""
+    id: UUID
+    name: str
+    email: str
+    role: str
+    created_at: datetime
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            role=user.role,
+            created_at=user.created_at,
+            token_version=user.token_version or 0,
+        )
+
+@dataclass(frozen=True)
+class TokenPrincipal:
+    """Caller identity taken from verified access token claims alone."""
+    id: UUID
+    role: str
+    token_version: int
+
+# user id (JWT "sub") -> UserSnapshot; profile updates invalidate, the TTL
+# bounds staleness across workers
+_user_cache = TTLCache(
+    "users",
+    maxsize=settings.user_cache_max_entries,
+    ttl=settings.user_cache_ttl_seconds,
+)
+
+def invalidate_cached_user(user_id) -> None:
+    _user_cache.pop(str(user_id))
+
+# user id -> current users.token_version. Short-lived so that a version bump
+# made by another worker (logout, role change) is seen within the TTL.
+_token_versions = TTLCache(
+    "token_versions",
+    maxsize=settings.user_cache_max_entries,
+    ttl=settings.token_version_ttl_seconds,
+)
+
+async def current_token_version(db: Session, user_id: str) -> int | None:
+    """The user's token version (None for unknown users), from the in-memory table when fresh."""
+    version = _token_versions.get(user_id)
+    if version is None:
+        version = await run_db(db, user_repo.get_token_version, user_id)
+        if version is not None:
+            _token_versions.set(user_id, version)
+    return version
+
+async def revoke_user_tokens(db: Session, user_id) -> None:
+    """Invalidate every token issued to the user so far."""
+    version = await run_db(db, user_repo.bump_token_version, user_id)
+    if version is not None:
+        _token_versions.set(str(user_id), version)
+    invalidate_cached_user(user_id)
+
+def access_token_claims(user: User) -> dict:
+    """Claims for create_access_token that let admin checks skip the user lookup."""
+    return {"sub": str(user.id), "role": user.role, "ver": user.token_version or 0}
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     encoded_jwt = jwt.encode(
         to_encode, 
         settings.jwt_secret, 
@@ -25,7 +97,7 @@ def create_access_token(data: dict) -> str:
 def create_refresh_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(days=7))
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid4().hex})
     return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 def decode_access_token(token: str):
@@ -34,10 +106,23 @@ def decode_access_token(token: str):
     except JWTError:
         return None
 
+async def is_token_revoked(db: Session, payload: dict) -> bool:
+    """Whether the token's jti was revoked; refreshes the store from the database when due."""
+    if revocation_store.claim_sync():
+        await run_db(db, revocation_store.sync)
+    jti = payload.get("jti")
+    return jti is not None and revocation_store.is_revoked(jti)
+
+async def revoke_token(db: Session, payload: dict) -> None:
+    """Revoke a single decoded token until its expiry."""
+    if "jti" in payload:
+        await run_db(db, revocation_store.revoke, payload["jti"], payload["exp"])
+
+@timed("auth")
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-):
+) -> UserSnapshot:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -46,17 +131,61 @@ async def get_current_user(
     
     try:
         payload = decode_access_token(token)
-        user_id: str = payload.get("sub")
+        user_id: str = payload.get("sub") if payload else None
         if user_id is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-        
-    user = user_repo.get_user_by_id(db, user_id)
-    if user is None:
+    if await is_token_revoked(db, payload):
         raise credentials_exception
+    
+    version = None
+    if "ver" in payload:
+        version = await current_token_version(db, user_id)
+        if version != payload["ver"]:
+            raise credentials_exception
+        
+    user = _user_cache.get(user_id)
+    if user is None or (version is not None and user.token_version != version):
+        db_user = await run_db(db, user_repo.get_user_by_id, user_id)
+        if db_user is None:
+            raise credentials_exception
+        user = UserSnapshot.from_user(db_user)
+        _user_cache.set(user_id, user)
     return user
 
+@timed("auth")
+async def get_token_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> TokenPrincipal | UserSnapshot:
+    """Identify the caller from the token's role/version claims.
+
+    Only the token version is checked, against the in-memory table, so the
+    common path does not touch the database. Tokens minted before role and
+    version claims existed fall back to get_current_user.
+    """
+    payload = decode_access_token(token)
+    if not payload or "sub" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if "role" not in payload or "ver" not in payload:
+        return await get_current_user(token, db)
+    
+    if (
+        await is_token_revoked(db, payload)
+        or await current_token_version(db, payload["sub"]) != payload["ver"]
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return TokenPrincipal(id=UUID(payload["sub"]), role=payload["role"], token_version=payload["ver"])
+
 def hash_password(password: str) -> str:
     # lazy import to avoid circular dependency with security module
     from app.services.security import hash_password as _hash
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+from uuid import UUID
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from app.db.models import Service
+from app.repositories import booking_repo
+from app.schemas.book_service import AvailabilityRead
+
+MAX_WINDOW = timedelta(days=92)
+
+
+def as_naive_utc(value: datetime) -> datetime:
+    # bookings.start_time/end_time are stored as naive UTC timestamps
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _align(moment: datetime, origin: datetime, step: timedelta) -> datetime:
+    """Round `moment` up to the next point on the grid origin + k * step."""
+    if moment <= origin:
+        return origin
+    return origin + -(-(moment - origin) // step) * step
+
+
+def compute_free_slots(
+    busy: Iterable[tuple[datetime, datetime]],
+    window_start: datetime,
+    window_end: datetime,
+    duration: timedelta,
+    step: timedelta,
+) -> list[datetime]:
+    """Sweep the busy intervals (sorted by start) and return the start of every open slot.
+
+    Candidate starts lie on the grid window_start + k * step; a slot is open when
+    [start, start + duration) fits inside the window without touching a busy interval.
+    """
+    slots = []
+    cursor = window_start
+    for busy_start, busy_end in busy:
+        while cursor + duration <= busy_start:
+            if cursor + duration > window_end:
+                return slots
+            slots.append(cursor)
+            cursor += step
+        if busy_end > cursor:
+            cursor = _align(busy_end, window_start, step)
+    while cursor + duration <= window_end:
+        slots.append(cursor)
+        cursor += step
+    return slots
+
+
+def get_availability(
+    db: Session,
+    service_id: UUID,
+    window_start: datetime,
+    window_end: datetime,
+    granularity_minutes: int | None = None,
+) -> AvailabilityRead:
+    window_start = as_naive_utc(window_start)
+    window_end = as_naive_utc(window_end)
+    if window_end <= window_start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if window_end - window_start > MAX_WINDOW:
+        raise HTTPException(status_code=400, detail=f"Window cannot exceed {MAX_WINDOW.days} days")
+
+    service = db.query(Service).filter(Service.id == service_id, Service.is_active == True).first()
+    if not service:
+        raise HTTPException(status_code=404, detail="Service not found or inactive")
+
+    granularity_minutes = granularity_minutes or service.duration_minutes
+    busy = booking_repo.get_active_intervals(db, service.id, window_start, window_end)
+    slots = compute_free_slots(
+        busy,
+        window_start,
+        window_end,
+        timedelta(minutes=service.duration_minutes),
+        timedelta(minutes=granularity_minutes),
+    )
+    return AvailabilityRead(
+        service_id=service.id,
+        window_start=window_start,
+        window_end=window_end,
+        duration_minutes=service.duration_minutes,
+        granularity_minutes=granularity_minutes,
+        slots=slots,
+    )
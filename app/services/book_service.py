@@ -1,11 +1,51 @@
+import threading
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.db.models import Service
-from app.schemas.book_service import ServiceCreate, ServiceUpdate
-from sqlalchemy import or_
+from app.schemas.book_service import ServiceCreate, ServiceRead, ServiceUpdate
+from sqlalchemy import func, or_
 from uuid import UUID
 from fastapi import HTTPException, status
 
+# Catalog reads are cached as ready-to-send JSON bytes so hits skip both the
+# query and Pydantic; writes below invalidate, the TTL covers other workers.
+# Misses are read from the primary (see the routes) so a lagging replica
+# cannot re-cache what a write just replaced.
+_list_cache = TTLCache(
+    "service_lists",
+    maxsize=settings.service_cache_max_entries,
+    ttl=settings.service_cache_ttl_seconds,
+)
+_detail_cache = TTLCache(
+    "service_details",
+    maxsize=settings.service_cache_max_entries,
+    ttl=settings.service_cache_ttl_seconds,
+)
+
+def _to_json(service: Service) -> bytes:
+    return ServiceRead.model_validate(service).model_dump_json().encode()
+
+# Bumped on every invalidation so a read racing a write does not cache the
+# payload it built from before the write
+_generation = 0
+_generation_lock = threading.Lock()
+
+def _cache_if_current(cache: TTLCache, key, payload: bytes, generation: int) -> None:
+    with _generation_lock:
+        if _generation == generation:
+            cache.set(key, payload)
+
+def invalidate_service_cache(service_id: UUID | None = None) -> None:
+    """Drop cached listings (and the detail entry of `service_id`, if given)."""
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        _list_cache.clear()
+        if service_id is not None:
+            _detail_cache.pop(service_id)
+
 def create_service(db: Session, service_in: ServiceCreate) -> Service:
     try:
         service_data = service_in.model_dump()
@@ -13,6 +53,7 @@ def create_service(db: Session, service_in: ServiceCreate) -> Service:
         db.add(new_service)
         db.commit()
         db.refresh(new_service)
+        invalidate_service_cache()
         return new_service
     except SQLAlchemyError as e:
         db.rollback()
@@ -26,16 +67,30 @@ def get_services(
     q: str | None = None,
     price_min: float | None = None,
     price_max: float | None = None,
-    active: bool | None = None
+    active: bool | None = None,
+    min_rating: float | None = None,
+    sort: str | None = None
 ) -> list[Service]:
     try:
         query = db.query(Service)
+        if sort == "rating":
+            # Served by ix_services_rating_average; unrated services go last
+            query = query.order_by(
+                Service.rating_average.desc().nulls_last(),
+                Service.rating_count.desc()
+            )
         if q:
+            # Full-text match on name/description (GIN on search_vector), with
+            # pg_trgm word similarity on name catching short and partial terms
+            tsquery = func.websearch_to_tsquery("english", q)
             query = query.filter(
                 or_(
-                    Service.name.ilike(f"%{q}%"), 
-                    Service.description.ilike(f"%{q}%")
+                    Service.search_vector.bool_op("@@")(tsquery),
+                    Service.name.bool_op("%>")(q)
                 )
+            ).order_by(
+                func.ts_rank(Service.search_vector, tsquery).desc(),
+                func.word_similarity(q, Service.name).desc()
             )
         if price_min is not None:
             query = query.filter(Service.price >= price_min)
@@ -43,6 +98,8 @@ def get_services(
             query = query.filter(Service.price <= price_max)
         if active is not None:
             query = query.filter(Service.is_active == active)
+        if min_rating is not None:
+            query = query.filter(Service.rating_average >= min_rating)
         return query.all()
     except SQLAlchemyError as e:
         raise HTTPException(
@@ -50,6 +107,34 @@ def get_services(
             detail=f"Database error: {str(e)}"
         )
 
+def get_services_json(
+    db: Session,
+    q: str | None = None,
+    price_min: float | None = None,
+    price_max: float | None = None,
+    active: bool | None = None,
+    min_rating: float | None = None,
+    sort: str | None = None
+) -> bytes:
+    """JSON array of ServiceRead for the filters, served from the cache when fresh."""
+    key = (q, price_min, price_max, active, min_rating, sort)
+    payload = _list_cache.get(key)
+    if payload is None:
+        generation = _generation
+        services = get_services(db, q, price_min, price_max, active, min_rating, sort)
+        payload = b"[" + b",".join(_to_json(service) for service in services) + b"]"
+        _cache_if_current(_list_cache, key, payload, generation)
+    return payload
+
+def get_service_json(db: Session, service_id: UUID) -> bytes:
+    """ServiceRead JSON for one service, served from the cache when fresh."""
+    payload = _detail_cache.get(service_id)
+    if payload is None:
+        generation = _generation
+        payload = _to_json(get_service(db, service_id))
+        _cache_if_current(_detail_cache, service_id, payload, generation)
+    return payload
+
 def get_service(db: Session, service_id: UUID) -> Service:
     try:
         service = db.query(Service).filter(Service.id == service_id).first()
@@ -72,6 +157,7 @@ def update_service(db: Session, service_id: UUID, service_in: ServiceUpdate) ->
             setattr(service, field, value)
         db.commit()
         db.refresh(service)
+        invalidate_service_cache(service_id)
         return service
     except SQLAlchemyError as e:
         db.rollback()
@@ -85,6 +171,7 @@ def delete_service(db: Session, service_id: UUID) -> bool:
         service = get_service(db, service_id)
         db.delete(service)
         db.commit()
+        invalidate_service_cache(service_id)
         return True
     except SQLAlchemyError as e:
         db.rollback()
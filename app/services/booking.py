@@ -1,19 +1,40 @@
 # app/services/booking.py
+import csv
+import io
+import json
+from typing import Iterator
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta, timezone
-from app.schemas.booking import BookingCreate, BookingUpdate, BookingResponse
+from app.core.config import settings
+from app.core.pagination import clamp_limit, decode_cursor, encode_cursor
+from app.core.timing import span
+from app.schemas.booking import BookingCreate, BookingUpdate, BookingPage, BookingResponse
 from app.repositories import booking_repo
-from app.db.models import Booking, Service, User
+from app.services.booking_index import booking_index
+from app.db.models import Booking, Service
+from app.services.auth import UserSnapshot
 from uuid import UUID
 from fastapi import HTTPException
 
+# SQLSTATE raised when ex_bookings_service_overlap rejects a row
+EXCLUSION_VIOLATION = "23P01"
+
+
+def _raise_if_overlap(db: Session, error: IntegrityError) -> None:
+    """Roll back and translate an overlap constraint violation into a 409."""
+    db.rollback()
+    if getattr(error.orig, "pgcode", None) == EXCLUSION_VIOLATION:
+        raise HTTPException(status_code=409, detail="Service already booked for this time slot")
 
 
 def create_booking(db: Session, booking: BookingCreate, user_id: UUID) -> BookingResponse:
     from sqlalchemy.orm import joinedload
     
     # ✅ check service exists
-    service = db.query(Service).filter(Service.id == booking.service_id, Service.is_active == True).first()
+    with span("booking_service"):
+        service = db.query(Service).filter(Service.id == booking.service_id, Service.is_active == True).first()
     if not service:
         raise HTTPException(status_code=404, detail="Service not found or inactive")
 
@@ -21,37 +42,39 @@ def create_booking(db: Session, booking: BookingCreate, user_id: UUID) -> Bookin
     if booking.end_time <= booking.start_time:
         raise HTTPException(status_code=400, detail="End time must be after start time")
 
-    # ✅ check for overlapping bookings
-    overlap = (
-        db.query(Booking)
-        .filter(
-            Booking.service_id == service.id,
-            Booking.start_time < booking.end_time,
-            Booking.end_time > booking.start_time,
-        )
-        .first()
-    )
-    if overlap:
+    # ✅ cheap in-process pre-check for hot services (BOOKING_INDEX_ENABLED; a
+    # no-op otherwise). The authoritative overlap check is the exclusion
+    # constraint, so its cost shows up in the booking_insert span.
+    with span("booking_precheck"):
+        conflict = booking_index.has_conflict(db, service.id, booking.start_time, booking.end_time)
+    if conflict:
         raise HTTPException(status_code=409, detail="Service already booked for this time slot")
 
-    # ✅ create booking via repo
-    db_booking = booking_repo.create_booking(db, booking, user_id)
+    # ✅ create booking via repo; overlaps are rejected by ex_bookings_service_overlap
+    try:
+        db_booking = booking_repo.create_booking(db, booking, user_id)
+    except IntegrityError as e:
+        _raise_if_overlap(db, e)
+        raise
     
     # ✅ explicitly load the service relationship
-    db_booking = (
-        db.query(Booking)
-        .filter(Booking.id == db_booking.id)
-        .options(joinedload(Booking.service))
-        .first()
-    )
+    with span("booking_reload"):
+        db_booking = (
+            db.query(Booking)
+            .filter(Booking.id == db_booking.id)
+            .options(joinedload(Booking.service))
+            .first()
+        )
     
     if not db_booking:
         raise HTTPException(status_code=500, detail="Error creating booking")
+    booking_index.record(db_booking)
 
-    return BookingResponse.model_validate(db_booking)
+    with span("booking_serialize"):
+        return BookingResponse.model_validate(db_booking)
 
 
-def get_booking(db: Session, booking_id: UUID, current_user: User) -> BookingResponse:
+def get_booking(db: Session, booking_id: UUID, current_user: UserSnapshot) -> BookingResponse:
     from sqlalchemy.orm import joinedload
     
     booking = (
@@ -67,7 +90,7 @@ def get_booking(db: Session, booking_id: UUID, current_user: User) -> BookingRes
     return BookingResponse.model_validate(booking)
 
 
-def update_booking(db: Session, booking_id: UUID, booking_in: BookingUpdate, current_user: User) -> BookingResponse:
+def update_booking(db: Session, booking_id: UUID, booking_in: BookingUpdate, current_user: UserSnapshot) -> BookingResponse:
     from sqlalchemy.orm import joinedload
     
     booking = (
@@ -108,24 +131,6 @@ def update_booking(db: Session, booking_id: UUID, booking_in: BookingUpdate, cur
                     detail="End time must be after start time"
                 )
 
-            # Check for overlapping bookings
-            overlap = (
-                db.query(Booking)
-                .filter(
-                    Booking.service_id == booking.service_id,
-                    Booking.id != booking.id,  # Exclude current booking
-                    Booking.status.in_(["pending", "confirmed"]),  # Only check active bookings
-                    Booking.start_time < booking_in.end_time,
-                    Booking.end_time > booking_in.start_time,
-                )
-                .first()
-            )
-            if overlap:
-                raise HTTPException(
-                    status_code=409,
-                    detail="Service already booked for this time slot"
-                )
-
             booking.start_time = booking_in.start_time
             booking.end_time = booking_in.end_time
 
@@ -151,16 +156,29 @@ def update_booking(db: Session, booking_id: UUID, booking_in: BookingUpdate, cur
                     status_code=400,
                     detail="End time must be after start time"
                 )
+            if booking_index.has_conflict(
+                db, booking.service_id, booking_in.start_time, booking_in.end_time, exclude_id=booking.id
+            ):
+                raise HTTPException(
+                    status_code=409,
+                    detail="Service already booked for this time slot"
+                )
             booking.start_time = booking_in.start_time
             booking.end_time = booking_in.end_time
 
-    db.commit()
+    # Overlapping reschedules (and reactivations) are rejected by the constraint
+    try:
+        db.commit()
+    except IntegrityError as e:
+        _raise_if_overlap(db, e)
+        raise
     db.refresh(booking)
+    booking_index.record(booking)
     
     return BookingResponse.model_validate(booking)
 
 
-def delete_booking(db: Session, booking_id: UUID, current_user: User) -> bool:
+def delete_booking(db: Session, booking_id: UUID, current_user: UserSnapshot) -> bool:
     booking = db.query(Booking).filter(Booking.id == booking_id).first()
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
@@ -171,56 +189,123 @@ def delete_booking(db: Session, booking_id: UUID, current_user: User) -> bool:
         if booking.start_time <= datetime.now(timezone.utc):
             raise HTTPException(status_code=400, detail="Cannot delete a booking that has started")
 
+    service_id = booking.service_id
     db.delete(booking)
     db.commit()
+    booking_index.forget(service_id, booking_id)
     return True
     
-def get_user_bookings(db: Session, user_id: UUID) -> list[BookingResponse]:
-    """Get all bookings for a specific user."""
+def _booking_page(query, limit: int, cursor: str | None) -> BookingPage:
+    """Keyset-paginate a Booking query over (start_time, id)."""
     from sqlalchemy.orm import joinedload
     
-    bookings = (
-        db.query(Booking)
-        .filter(Booking.user_id == user_id)
-        .options(joinedload(Booking.service))  # Eagerly load the service relationship
-        .all()
+    limit = clamp_limit(limit)
+    query = query.options(joinedload(Booking.service)).order_by(Booking.start_time, Booking.id)
+    if cursor:
+        after = decode_cursor(cursor, datetime.fromisoformat, UUID)
+        query = query.filter(tuple_(Booking.start_time, Booking.id) > after)
+    
+    bookings = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(bookings) > limit:
+        bookings = bookings[:limit]
+        next_cursor = encode_cursor(bookings[-1].start_time, bookings[-1].id)
+    return BookingPage(
+        items=[BookingResponse.model_validate(booking) for booking in bookings],
+        next_cursor=next_cursor,
     )
-    return [BookingResponse.model_validate(booking) for booking in bookings]
+
+def get_user_bookings(
+    db: Session,
+    user_id: UUID,
+    limit: int = settings.page_size_default,
+    cursor: str | None = None
+) -> BookingPage:
+    """Get a page of bookings for a specific user."""
+    query = db.query(Booking).filter(Booking.user_id == user_id)
+    return _booking_page(query, limit, cursor)
 
 def get_all_bookings(
     db: Session, 
     status: str | None = None, 
     start_from: datetime | None = None,
-    end_to: datetime | None = None
-) -> list[BookingResponse]:
-    """Get all bookings with optional filters."""
-    from sqlalchemy.orm import joinedload
-    
-    query = db.query(Booking).options(joinedload(Booking.service))
-    
+    end_to: datetime | None = None,
+    limit: int = settings.page_size_default,
+    cursor: str | None = None
+) -> BookingPage:
+    """Get a page of bookings with optional filters."""
+    query = _filter_bookings(db.query(Booking), status, start_from, end_to)
+    return _booking_page(query, limit, cursor)
+
+def _filter_bookings(query, status: str | None, start_from: datetime | None, end_to: datetime | None):
     if status:
         query = query.filter(Booking.status == status)
     if start_from:
         query = query.filter(Booking.start_time >= start_from)
     if end_to:
         query = query.filter(Booking.end_time <= end_to)
-        
-    bookings = query.all()
-    return [BookingResponse.model_validate(booking) for booking in bookings]
-    db.commit()
-    return True
+    return query
 
-def get_all_bookings(
+EXPORT_COLUMNS = ("id", "user_id", "service_id", "service_name", "start_time", "end_time", "status", "created_at")
+EXPORT_BATCH_SIZE = 1000
+
+def _export_record(row) -> list[str | None]:
+    return [
+        str(row.id),
+        str(row.user_id) if row.user_id else None,
+        str(row.service_id) if row.service_id else None,
+        row.service_name,
+        row.start_time.isoformat(),
+        row.end_time.isoformat(),
+        row.status,
+        row.created_at.isoformat() if row.created_at else None,
+    ]
+
+def export_bookings(
     db: Session,
-    status: str = None,
-    start_from: datetime = None,
-    end_to: datetime = None
-    ):
-    query = db.query(Booking)
-    if status:
-        query = query.filter(Booking.status == status)
-    if start_from:
-        query = query.filter(Booking.start_time >= start_from)
-    if end_to:
-        query = query.filter(Booking.end_time <= end_to)
-    return query.all()
+    export_format: str,
+    status: str | None = None,
+    start_from: datetime | None = None,
+    end_to: datetime | None = None
+) -> Iterator[str]:
+    """Stream matching bookings as NDJSON or CSV text chunks.
+
+    Rows come from a server-side cursor in batches of EXPORT_BATCH_SIZE and are
+    never materialized as ORM objects, so memory stays flat for any export size.
+    """
+    query = (
+        db.query(
+            Booking.id,
+            Booking.user_id,
+            Booking.service_id,
+            Service.name.label("service_name"),
+            Booking.start_time,
+            Booking.end_time,
+            Booking.status,
+            Booking.created_at,
+        )
+        .outerjoin(Service, Booking.service_id == Service.id)
+    )
+    query = _filter_bookings(query, status, start_from, end_to)
+    rows = query.order_by(Booking.start_time, Booking.id).yield_per(EXPORT_BATCH_SIZE)
+
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(_export_record(row))
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        lines = []
+        for row in rows:
+            lines.append(json.dumps(dict(zip(EXPORT_COLUMNS, _export_record(row)))))
+            if len(lines) == EXPORT_BATCH_SIZE:
+                yield "\n".join(lines) + "\n"
+                lines.clear()
+        if lines:
+            yield "\n".join(lines) + "\n"
@@ -0,0 +1,139 @@
+import threading
+from bisect import bisect_left
+from datetime import datetime
+from uuid import UUID
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache, register_cache
+from app.core.config import settings
+from app.db.models import ACTIVE_BOOKING_STATUSES, Booking
+from app.repositories import booking_repo
+from app.services.availability import as_naive_utc
+
+
+class ServiceIntervals:
+    """Active bookings of one service as (start, end, id) tuples sorted by start."""
+
+    __slots__ = ("intervals", "starts")
+
+    def __init__(self, rows):
+        self.intervals = [(row.start_time, row.end_time, row.id) for row in rows]
+        self.intervals.sort()
+        self.starts = [interval[0] for interval in self.intervals]
+
+    def add(self, start: datetime, end: datetime, booking_id: UUID) -> None:
+        index = bisect_left(self.starts, start)
+        self.starts.insert(index, start)
+        self.intervals.insert(index, (start, end, booking_id))
+
+    def remove(self, booking_id: UUID) -> None:
+        for index, interval in enumerate(self.intervals):
+            if interval[2] == booking_id:
+                del self.intervals[index]
+                del self.starts[index]
+                return
+
+    def conflicts(self, start: datetime, end: datetime, exclude_id: UUID | None = None) -> bool:
+        # Everything left of `index` starts before `end`; active bookings of a
+        # service never overlap, so their ends are sorted too and we only need
+        # to walk back while they still end after `start`.
+        index = bisect_left(self.starts, end) - 1
+        while index >= 0:
+            other_start, other_end, other_id = self.intervals[index]
+            if other_end <= start:
+                return False
+            if other_id != exclude_id:
+                return True
+            index -= 1
+        return False
+
+
+class BookingIntervalIndex:
+    """In-process pre-check for booking conflicts, one sorted interval list per service.
+
+    Entries are warmed lazily from the database, kept current by the booking
+    service on create/update/delete, evicted LRU-first and expire after a TTL
+    so writes made by other workers are picked up. A hit is rejected without
+    touching the database; a miss is left to ex_bookings_service_overlap,
+    which stays authoritative. The price is a staleness window: for up to
+    booking_index_ttl_seconds after another worker cancels, moves or deletes
+    a booking, this worker may still answer 409 for its old slot.
+    """
+
+    def __init__(self, enabled: bool, maxsize: int, ttl: float):
+        self.enabled = enabled
+        self.conflicts_rejected = 0
+        self._services = TTLCache(None, maxsize=maxsize, ttl=ttl)
+        # Bumped on every write so a warm-up racing a write is not cached
+        self._generations: dict[UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def _intervals(self, db: Session, service_id: UUID) -> ServiceIntervals:
+        intervals = self._services.get(service_id)
+        if intervals is not None:
+            return intervals
+        generation = self._generations.get(service_id, 0)
+        intervals = ServiceIntervals(
+            booking_repo.get_upcoming_active_intervals(db, service_id, datetime.utcnow())
+        )
+        with self._lock:
+            if self._generations.get(service_id, 0) == generation:
+                self._services.set(service_id, intervals)
+        return intervals
+
+    def has_conflict(
+        self,
+        db: Session,
+        service_id: UUID,
+        start: datetime,
+        end: datetime,
+        exclude_id: UUID | None = None,
+    ) -> bool:
+        if not self.enabled:
+            return False
+        intervals = self._intervals(db, service_id)
+        with self._lock:
+            hit = intervals.conflicts(as_naive_utc(start), as_naive_utc(end), exclude_id)
+            if hit:
+                self.conflicts_rejected += 1
+        return hit
+
+    def record(self, booking: Booking) -> None:
+        """Bring a committed booking's entry up to date (insert, move or drop it)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._generations[booking.service_id] = self._generations.get(booking.service_id, 0) + 1
+            intervals = self._services.peek(booking.service_id)
+            if intervals is None:
+                return
+            intervals.remove(booking.id)
+            if booking.status in ACTIVE_BOOKING_STATUSES:
+                intervals.add(as_naive_utc(booking.start_time), as_naive_utc(booking.end_time), booking.id)
+
+    def forget(self, service_id: UUID, booking_id: UUID) -> None:
+        """Drop a deleted booking from its service's entry."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._generations[service_id] = self._generations.get(service_id, 0) + 1
+            intervals = self._services.peek(service_id)
+            if intervals is not None:
+                intervals.remove(booking_id)
+
+    def clear(self) -> None:
+        self._services.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            **self._services.stats(),
+            "conflicts_rejected": self.conflicts_rejected,
+        }
+
+
+booking_index = BookingIntervalIndex(
+    enabled=settings.booking_index_enabled,
+    maxsize=settings.booking_index_max_services,
+    ttl=settings.booking_index_ttl_seconds,
+)
+register_cache("booking_intervals", booking_index)
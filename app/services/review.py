@@ -1,12 +1,17 @@
-from typing import List
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from app.db.models import Review, Booking, Service, User
+from app.db.models import Review, Booking, Service
+from app.services.auth import UserSnapshot
 from uuid import UUID
-from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewRead
+from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewRead, ReviewSummary, ServiceReviewPage
+from app.schemas.book_service import ServiceRead
+from app.core.config import settings
+from app.core.pagination import clamp_limit, decode_cursor, encode_cursor
+from datetime import datetime
 from app.repositories import review_repo
+from app.services.book_service import invalidate_service_cache
 
-def create_review(db: Session, review: ReviewCreate, current_user: User) -> ReviewRead:
+def create_review(db: Session, review: ReviewCreate, current_user: UserSnapshot) -> ReviewRead:
     booking = db.query(Booking).filter(Booking.id == str(review.booking_id)).first()
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
@@ -19,39 +24,82 @@ def create_review(db: Session, review: ReviewCreate, current_user: User) -> Revi
     if not (1 <= review.rating <= 5):
         raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
     
+    # The aggregate UPDATE is committed together with the review insert
+    review_repo.adjust_service_rating(db, booking.service_id, added=review.rating)
     db_review = review_repo.create_review(db, review, current_user.id)
     db_review.booking_id = booking.id
     db.commit()
     db.refresh(db_review)
+    invalidate_service_cache(booking.service_id)
     return ReviewRead.from_orm(db_review)
 
-def get_service_reviews(db: Session, service_id: UUID) -> List[ReviewRead]:
+def get_service_review_page(
+    db: Session,
+    service_id: UUID,
+    limit: int = settings.page_size_default,
+    cursor: str | None = None,
+    sort: str = "recent"
+) -> ServiceReviewPage:
+    """Keyset-paginated reviews of a service, with the service itself sent once."""
     service = db.query(Service).filter(Service.id == service_id).first()
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
-    return review_repo.get_service_reviews(db, str(service.id))
+    
+    limit = clamp_limit(limit)
+    after = None
+    if cursor:
+        parsers = (datetime.fromisoformat, UUID)
+        if sort == "rating":
+            parsers = (int,) + parsers
+        after = decode_cursor(cursor, *parsers)
+    
+    rows = review_repo.get_service_review_rows(db, service.id, limit + 1, sort, after)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        key = (last.created_at, last.id)
+        if sort == "rating":
+            key = (last.rating,) + key
+        next_cursor = encode_cursor(*key)
+    return ServiceReviewPage(
+        service=ServiceRead.model_validate(service),
+        items=[ReviewSummary.model_validate(row) for row in rows],
+        next_cursor=next_cursor,
+    )
 
-def update_review(db: Session, review_id: str, review_in: ReviewUpdate, current_user: User) -> ReviewRead:
-    review = db.query(Review).filter(Review.id == review_id).first()
+def update_review(db: Session, review_id: str, review_in: ReviewUpdate, current_user: UserSnapshot) -> ReviewRead:
+    # Locked until the commit so concurrent writes apply their rating deltas in turn
+    review = db.query(Review).filter(Review.id == review_id).with_for_update().first()
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     if review.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized")
-    if review_in.rating and not (1 <= review_in.rating <= 5):
+    if review_in.rating is not None and not (1 <= review_in.rating <= 5):
         raise HTTPException(status_code=400, detail="Rating must be between 1 and 5")
     
+    service_id = None
+    if review_in.rating is not None and review_in.rating != review.rating:
+        service_id = db.query(Booking.service_id).filter(Booking.id == review.booking_id).scalar()
+        review_repo.adjust_service_rating(db, service_id, added=review_in.rating, removed=review.rating)
+    
     review = review_repo.update_review(db, review_id, review_in)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     db.refresh(review)
+    if service_id is not None:
+        invalidate_service_cache(service_id)
     return ReviewRead.from_orm(review)
 
-def delete_review(db: Session, review_id: str, current_user: User) -> bool:
-    review = db.query(Review).filter(Review.id == review_id).first()
+def delete_review(db: Session, review_id: str, current_user: UserSnapshot) -> bool:
+    review = db.query(Review).filter(Review.id == review_id).with_for_update().first()
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
     if review.user_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
     
+    service_id = db.query(Booking.service_id).filter(Booking.id == review.booking_id).scalar()
+    review_repo.adjust_service_rating(db, service_id, removed=review.rating)
     review_repo.delete_review(db, review_id)
+    invalidate_service_cache(service_id)
     return True
\ No newline at end of file
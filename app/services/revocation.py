@@ -0,0 +1,157 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session
+from app.core.cache import register_cache
+from app.core.config import settings
+from app.repositories import token_repo
+
+# Revocations committed by another worker may carry a revoked_at slightly
+# older than our last sync; re-reading this much history makes that harmless.
+SYNC_OVERLAP = timedelta(seconds=60)
+PURGE_INTERVAL = 3600.0
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    Lookups only read the bit array, so they need no lock; add() is guarded
+    because `bits[i] |= mask` is a read-modify-write.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key: str) -> None:
+        positions = self._positions(key)
+        with self._lock:
+            for position in positions:
+                self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationStore:
+    """Revoked token ids (JWT "jti") of this worker, with their expiry.
+
+    A Bloom filter answers the common "not revoked" case without touching the
+    dict or any lock. Entries drop out once the token would have expired
+    anyway; since a Bloom filter cannot forget, it is rebuilt from the live
+    entries and swapped in when purging removes some. The revoked_tokens
+    table is the source of truth: every `sync_interval` seconds the store
+    pulls revocations recorded by other workers (or before a restart).
+    """
+
+    def __init__(self, capacity: int, error_rate: float, sync_interval: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.filter_hits = 0
+        self.revoked_hits = 0
+        self._expiry: dict[str, float] = {}
+        self._filter = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+        self._synced_at: datetime | None = None
+        self._next_sync = 0.0
+        self._next_purge = 0.0
+
+    def is_revoked(self, jti: str) -> bool:
+        if jti not in self._filter:
+            return False
+        self.filter_hits += 1
+        expires_at = self._expiry.get(jti)
+        if expires_at is None or expires_at <= time.time():
+            return False
+        self.revoked_hits += 1
+        return True
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._expiry[jti] = expires_at
+            self._filter.add(jti)
+
+    def revoke(self, db: Session, jti: str, expires_at: float) -> None:
+        """Record a revocation locally and in revoked_tokens."""
+        self.add(jti, expires_at)
+        token_repo.revoke_token(db, jti, datetime.fromtimestamp(expires_at, timezone.utc).replace(tzinfo=None))
+
+    def claim_sync(self) -> bool:
+        """Whether a sync is due, in which case the caller runs it and the next one moves out."""
+        with self._lock:
+            if time.monotonic() < self._next_sync:
+                return False
+            self._next_sync = time.monotonic() + self.sync_interval
+            return True
+
+    def sync(self, db: Session) -> None:
+        """Pull new revocations from the database and drop expired entries.
+
+        Run it after claim_sync(), so concurrent requests do not sync together.
+        """
+        now = _utcnow()
+        since = self._synced_at - SYNC_OVERLAP if self._synced_at else None
+        rows = token_repo.get_revocations_since(db, since, now)
+        self._synced_at = now
+        for jti, expires_at in rows:
+            if jti not in self._expiry:
+                self.add(jti, expires_at.replace(tzinfo=timezone.utc).timestamp())
+        self._purge()
+        if time.monotonic() >= self._next_purge:
+            self._next_purge = time.monotonic() + PURGE_INTERVAL
+            # Its own session: committing the request's transaction is not ours to do
+            with Session(bind=db.get_bind()) as purge_db:
+                token_repo.delete_expired_revocations(purge_db, now)
+
+    def _purge(self) -> None:
+        now = time.time()
+        with self._lock:
+            live = {jti: exp for jti, exp in self._expiry.items() if exp > now}
+            if len(live) == len(self._expiry):
+                return
+            rebuilt = BloomFilter(max(self.capacity, 2 * len(live)), self.error_rate)
+            for jti in live:
+                rebuilt.add(jti)
+            self._expiry = live
+            self._filter = rebuilt
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiry = {}
+            self._filter = BloomFilter(self.capacity, self.error_rate)
+            self._synced_at = None
+            self._next_sync = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._expiry),
+            "filter_bits": self._filter.size,
+            "filter_hashes": self._filter.hashes,
+            "filter_hits": self.filter_hits,
+            "revoked_hits": self.revoked_hits,
+            "last_sync": self._synced_at.isoformat() if self._synced_at else None,
+        }
+
+
+revocation_store = RevocationStore(
+    capacity=settings.revocation_filter_capacity,
+    error_rate=settings.revocation_filter_error_rate,
+    sync_interval=settings.revocation_sync_seconds,
+)
+register_cache("revoked_tokens", revocation_store)
@@ -1,11 +1,34 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
-from app.services.auth import get_current_user
-from app.db.models import User
+from app.core.config import settings
+from app.services.auth import get_token_principal, TokenPrincipal, UserSnapshot
 
 # Simplified bcrypt configuration to avoid version detection issues
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL while hashing, so a small thread pool gives real
+# parallelism without the pickling overhead of a process pool.
+_hash_executor: ThreadPoolExecutor | None = None
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    """Return the bounded executor used for bcrypt work, creating it on first use."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="password-hash",
+        )
+    return _hash_executor
+
+def shutdown_hash_executor() -> None:
+    """Stop the password hashing executor (called on application shutdown)."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=False)
+        _hash_executor = None
+
 def hash_password(password: str) -> str:
     # Check both string length and byte length
     if len(password) > 72:
@@ -31,7 +54,21 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing executor without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hash_executor(), verify_password, plain_password, hashed_password
+    )
+
+async def require_admin(
+    current_user: TokenPrincipal | UserSnapshot = Depends(get_token_principal)
+) -> TokenPrincipal | UserSnapshot:
     if getattr(current_user, "role", None) != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
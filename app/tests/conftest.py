@@ -1,11 +1,33 @@
 import pytest
+from contextlib import contextmanager
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from app.db.base import Base
 from app.main import app
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
+from app.core.cache import clear_caches
+from app.db.query_stats import capture_queries
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    # In-process caches outlive the per-test transaction rollback
+    clear_caches()
+    yield
+    clear_caches()
+
+@pytest.fixture
+def assert_max_queries():
+    """Query budget for a block: `with assert_max_queries(3): client.get(...)`."""
+    @contextmanager
+    def budget(limit: int):
+        with capture_queries() as queries:
+            yield queries
+        assert queries.count <= limit, (
+            f"{queries.count} SQL statements, budget {limit}: " + "; ".join(queries.statements)
+        )
+    return budget
 
 @pytest.fixture(scope="session")
 def db_engine():
@@ -40,6 +62,7 @@ def client(db):
             pass
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
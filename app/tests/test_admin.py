@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.config import settings
+from app.db.models import User
+from app.services.security import require_admin
+
+# Using fixtures from conftest.py
+
+@pytest.fixture
+def admin_client(client: TestClient):
+    app.dependency_overrides[require_admin] = lambda: User(name="Admin", email="pool-admin@example.com", role="admin")
+    yield client
+    del app.dependency_overrides[require_admin]
+
+def test_pool_stats_count_checkouts(admin_client: TestClient):
+    from app.db.session import engine
+    
+    before = admin_client.get("/admin/db/pool").json()["primary"]
+    with engine.connect():
+        pass
+    stats = admin_client.get("/admin/db/pool").json()["primary"]
+    
+    assert stats["checkouts"] == before["checkouts"] + 1
+    assert stats["wait_ms"]["count"] == before["wait_ms"]["count"] + 1
+    assert stats["wait_ms"]["histogram"]["le_+Inf"] == stats["wait_ms"]["count"]
+    assert stats["size"] == settings.db_pool_size
+
+def test_slow_queries_endpoint(admin_client: TestClient):
+    from app.db.slow_queries import slow_query_log
+    
+    slow_query_log.observe("SELECT pg_sleep(1)", {}, 1000.0, "asyncpg")
+    try:
+        body = admin_client.get("/admin/db/slow-queries").json()
+        [entry] = [entry for entry in body["queries"] if entry["statement"] == "SELECT pg_sleep(?)"]
+        assert entry["plan_error"].startswith("EXPLAIN is only captured for psycopg2")
+        
+        assert admin_client.delete("/admin/db/slow-queries").status_code == 204
+        assert admin_client.get("/admin/db/slow-queries").json()["queries"] == []
+    finally:
+        slow_query_log.clear()
+
+def test_loop_stalls_endpoint(admin_client: TestClient):
+    body = admin_client.get("/admin/loop-stalls").json()
+    assert body["enabled"] == settings.loop_watchdog_enabled
+    assert body["threshold_ms"] == settings.loop_stall_ms
+    assert isinstance(body["stalls"], list)
@@ -40,6 +40,103 @@ def test_register_and_login(client: TestClient, db: Session):
     assert response.status_code == 200
     assert "access_token" in response.json()
 
+def test_register_duplicate_email(client: TestClient, user: User):
+    response = client.post(
+        "/auth/register",
+        json={"name": "Someone Else", "email": "test@example.com", "password": "anotherpassword1"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
 def test_unauthorized_access(client: TestClient):
     response = client.get("/bookings")
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+def test_current_user_cached_until_profile_update(client: TestClient, user: User):
+    from app.core.cache import cache_stats
+    from app.services.auth import create_access_token
+    
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+    assert client.get("/me", headers=headers).json()["name"] == "Test User"
+    hits = cache_stats()["users"]["hits"]
+    assert client.get("/me", headers=headers).status_code == 200
+    assert cache_stats()["users"]["hits"] == hits + 1
+    
+    response = client.patch("/me", headers=headers, json={"name": "Renamed User"})
+    assert response.status_code == 200
+    assert client.get("/me", headers=headers).json()["name"] == "Renamed User"
+
+def login_headers(client: TestClient) -> dict:
+    response = client.post("/auth/login", data={"username": "test@example.com", "password": "securepassword123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_logout_revokes_only_the_presented_token(client: TestClient, user: User):
+    from app.services.revocation import revocation_store
+    
+    headers, other_session = login_headers(client), login_headers(client)
+    assert client.get("/me", headers=headers).status_code == 200
+    
+    assert client.post("/auth/logout", headers=headers).status_code == 204
+    assert client.get("/me", headers=headers).status_code == 401
+    assert client.get("/me", headers=other_session).status_code == 200
+    
+    # A fresh worker (empty store) learns the revocation from revoked_tokens
+    revocation_store.clear()
+    assert client.get("/me", headers=headers).status_code == 401
+
+def test_logout_all_retires_every_session(client: TestClient, user: User):
+    headers, other_session = login_headers(client), login_headers(client)
+    assert client.post("/auth/logout", headers=headers, params={"all": True}).status_code == 204
+    assert client.get("/me", headers=other_session).status_code == 401
+
+def test_revocation_sync_runs_once_per_interval(db: Session):
+    from datetime import datetime, timedelta
+    from app.db.models import RevokedToken
+    from app.services.revocation import RevocationStore
+    
+    db.add(RevokedToken(jti="expired", expires_at=datetime.utcnow() - timedelta(minutes=1)))
+    db.commit()
+    store = RevocationStore(capacity=100, error_rate=0.01, sync_interval=60)
+    
+    # The first request to find a sync due claims it; the others skip it
+    assert store.claim_sync()
+    assert not store.claim_sync()
+    
+    store.sync(db)
+    db.expire_all()
+    assert db.get(RevokedToken, "expired") is None
+
+def test_require_admin_authorizes_from_claims(client: TestClient, db: Session):
+    from app.core.cache import cache_stats
+    from app.services.auth import access_token_claims, create_access_token
+    
+    admin = User(name="Claims Admin", email="claims-admin@example.com", hashed_password="x", role="admin")
+    db.add(admin)
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(data=access_token_claims(admin))}"}
+    misses = cache_stats()["users"]["misses"]
+    
+    response = client.post(
+        "/services/",
+        headers=headers,
+        json={"name": "Claims Service", "description": "Created via role claim", "price": 10.0, "duration_minutes": 30}
+    )
+    assert response.status_code == 201
+    assert cache_stats()["users"]["misses"] == misses
+    
+    # Demoting the user the documented way, in SQL, retires tokens that still
+    # claim the admin role
+    from sqlalchemy import text
+    from app.services.auth import _token_versions
+    db.execute(text("UPDATE users SET role = 'user' WHERE id = :id"), {"id": admin.id})
+    db.commit()
+    db.refresh(admin)
+    assert admin.token_version == 1
+    
+    _token_versions.clear()  # TOKEN_VERSION_TTL_SECONDS later, or on another worker
+    response = client.post(
+        "/services/",
+        headers=headers,
+        json={"name": "Demoted Service", "description": "Stale admin token", "price": 10.0, "duration_minutes": 30}
+    )
+    assert response.status_code == 401
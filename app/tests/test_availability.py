@@ -0,0 +1,50 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.db.models import Booking, Service
+from app.services.availability import compute_free_slots
+
+DAY = datetime(2030, 1, 7)
+HOUR = timedelta(hours=1)
+
+def test_free_slots_skip_busy_intervals():
+    busy = [(DAY + 1 * HOUR, DAY + 2 * HOUR), (DAY + 3 * HOUR, DAY + 5 * HOUR)]
+    slots = compute_free_slots(busy, DAY, DAY + 6 * HOUR, HOUR, HOUR)
+    assert slots == [DAY, DAY + 2 * HOUR, DAY + 5 * HOUR]
+
+def test_free_slots_realign_after_off_grid_booking():
+    half = timedelta(minutes=30)
+    busy = [(DAY, DAY + timedelta(minutes=40))]
+    slots = compute_free_slots(busy, DAY, DAY + 2 * HOUR, HOUR, half)
+    assert slots == [DAY + HOUR]
+
+@pytest.fixture
+def service(db: Session):
+    service = Service(
+        name="Availability Service",
+        description="Test Description",
+        price=100.0,
+        duration_minutes=60,
+        is_active=True
+    )
+    db.add(service)
+    db.commit()
+    db.refresh(service)
+    return service
+
+def test_availability_endpoint_ignores_cancelled(client: TestClient, db: Session, service: Service):
+    db.add_all([
+        Booking(service_id=service.id, start_time=DAY + 9 * HOUR, end_time=DAY + 10 * HOUR, status="confirmed"),
+        Booking(service_id=service.id, start_time=DAY + 10 * HOUR, end_time=DAY + 11 * HOUR, status="cancelled"),
+    ])
+    db.commit()
+    
+    response = client.get(
+        f"/services/{service.id}/availability",
+        params={"from": (DAY + 9 * HOUR).isoformat(), "to": (DAY + 12 * HOUR).isoformat()}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["granularity_minutes"] == 60
+    assert body["slots"] == [(DAY + 10 * HOUR).isoformat(), (DAY + 11 * HOUR).isoformat()]
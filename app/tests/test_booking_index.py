@@ -0,0 +1,54 @@
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from uuid import uuid4
+from app.core import cache
+from app.repositories import booking_repo
+from app.services.booking_index import BookingIntervalIndex, ServiceIntervals
+
+START = datetime(2030, 1, 7, 9)
+HOUR = timedelta(hours=1)
+
+def row(start, end):
+    return SimpleNamespace(id=uuid4(), start_time=start, end_time=end)
+
+def test_service_intervals_detect_overlap():
+    first, second = row(START, START + HOUR), row(START + 2 * HOUR, START + 3 * HOUR)
+    intervals = ServiceIntervals([second, first])
+    
+    assert intervals.conflicts(START + HOUR / 2, START + 2 * HOUR)
+    assert not intervals.conflicts(START + HOUR, START + 2 * HOUR)  # touching is fine
+    assert not intervals.conflicts(second.start_time, second.end_time, exclude_id=second.id)
+    
+    intervals.remove(first.id)
+    assert not intervals.conflicts(START, START + HOUR)
+
+def test_record_keeps_warm_entry_current():
+    index = BookingIntervalIndex(enabled=True, maxsize=2, ttl=60)
+    service_id = uuid4()
+    index._services.set(service_id, ServiceIntervals([]))
+    
+    booking = SimpleNamespace(
+        id=uuid4(), service_id=service_id, start_time=START, end_time=START + HOUR, status="pending"
+    )
+    index.record(booking)
+    assert index.has_conflict(None, service_id, START, START + HOUR)
+    
+    booking.status = "cancelled"
+    index.record(booking)
+    assert not index.has_conflict(None, service_id, START, START + HOUR)
+    assert index.stats()["conflicts_rejected"] == 1
+
+def test_hits_are_trusted_until_the_entry_expires(monkeypatch):
+    monkeypatch.setattr(booking_repo, "get_upcoming_active_intervals", lambda *args: [])
+    index = BookingIntervalIndex(enabled=True, maxsize=2, ttl=60)
+    service_id = uuid4()
+    index._services.set(service_id, ServiceIntervals([row(START, START + HOUR)]))
+    
+    # Another worker cancelled the booking: rejected without a query until the TTL runs out
+    assert index.has_conflict(None, service_id, START, START + HOUR)
+    
+    later = time.monotonic() + 61
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: later))
+    assert not index.has_conflict(None, service_id, START, START + HOUR)
+    assert index.stats()["conflicts_rejected"] == 1
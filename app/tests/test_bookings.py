@@ -84,4 +84,97 @@ def test_create_booking_conflict(db: Session, user: User, service: Service):
         assert False, "Should have raised an HTTPException for conflicting booking"
     except HTTPException as e:
         assert e.status_code == 409, f"Expected conflict error with status code 409, got {e.status_code}"
-        assert "already booked" in e.detail, f"Expected 'already booked' in error detail, got {e.detail}"
\ No newline at end of file
+        assert "already booked" in e.detail, f"Expected 'already booked' in error detail, got {e.detail}"
+
+def test_cancelled_booking_does_not_block_slot(db: Session, user: User, service: Service):
+    from app.repositories import booking_repo
+    from app.schemas.booking import BookingCreate
+    from app.services.booking import create_booking
+    
+    start_time = datetime.now() + timedelta(days=2)
+    booking_data = BookingCreate(
+        service_id=service.id,
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=1)
+    )
+    
+    cancelled = booking_repo.create_booking(db, booking_data, user.id)
+    booking_repo.update_booking_status(db, cancelled.id, "cancelled")
+    
+    booking = create_booking(db, booking_data, user.id)
+    assert booking.status == "pending"
+
+def test_reschedule_into_taken_slot_conflicts(db: Session, user: User, service: Service):
+    from app.repositories import booking_repo
+    from app.schemas.booking import BookingCreate, BookingUpdate
+    from app.services.booking import update_booking
+    
+    start_time = datetime.now() + timedelta(days=3)
+    first = booking_repo.create_booking(
+        db,
+        BookingCreate(service_id=service.id, start_time=start_time, end_time=start_time + timedelta(hours=1)),
+        user.id
+    )
+    second = booking_repo.create_booking(
+        db,
+        BookingCreate(service_id=service.id, start_time=start_time + timedelta(hours=2), end_time=start_time + timedelta(hours=3)),
+        user.id
+    )
+    
+    with pytest.raises(HTTPException) as exc_info:
+        update_booking(
+            db,
+            second.id,
+            BookingUpdate(start_time=first.start_time, end_time=first.end_time),
+            user
+        )
+    assert exc_info.value.status_code == 409
+
+def test_my_bookings_keyset_pagination(client: TestClient, db: Session, user: User, service: Service, auth_token: str):
+    start_time = datetime.now() + timedelta(days=5)
+    for hour in range(3):
+        db.add(Booking(
+            user_id=user.id,
+            service_id=service.id,
+            start_time=start_time + timedelta(hours=hour),
+            end_time=start_time + timedelta(hours=hour, minutes=30),
+            status="pending"
+        ))
+    db.commit()
+    headers = {"Authorization": f"Bearer {auth_token}"}
+    
+    first = client.get("/bookings/me", params={"limit": 2}, headers=headers).json()
+    assert len(first["items"]) == 2
+    assert first["next_cursor"]
+    
+    second = client.get("/bookings/me", params={"limit": 2, "cursor": first["next_cursor"]}, headers=headers).json()
+    assert len(second["items"]) == 1
+    assert second["next_cursor"] is None
+    assert second["items"][0]["start_time"] > first["items"][1]["start_time"]
+
+def test_export_bookings_csv(client: TestClient, db: Session, user: User, service: Service):
+    from app.main import app
+    from app.services.auth import get_current_user
+    
+    start_time = datetime.now() + timedelta(days=6)
+    db.add(Booking(
+        user_id=user.id,
+        service_id=service.id,
+        start_time=start_time,
+        end_time=start_time + timedelta(hours=1),
+        status="confirmed"
+    ))
+    db.commit()
+    
+    admin = User(name="Export Admin", email="export-admin@example.com", hashed_password="x", role="admin")
+    app.dependency_overrides[get_current_user] = lambda: admin
+    try:
+        response = client.get("/bookings/export", params={"format": "csv", "status": "confirmed"})
+    finally:
+        del app.dependency_overrides[get_current_user]
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.strip().splitlines()
+    assert lines[0].startswith("id,user_id,service_id,service_name")
+    assert any("Test Service" in line for line in lines[1:])
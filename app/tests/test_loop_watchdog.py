@@ -0,0 +1,57 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.util import greenlet_spawn
+from app.core.loop_watchdog import LoopWatchdog
+
+def block_the_loop():
+    time.sleep(0.2)
+
+async def login_endpoint(scope, receive, send):
+    block_the_loop()
+
+async def run_sync_endpoint(scope, receive, send):
+    # Like run_db with an AsyncSession: the blocking call runs in a greenlet
+    await greenlet_spawn(block_the_loop)
+
+class RequestCycle:
+    """Stands in for uvicorn's per-request object, whose run_asgi is the task's coroutine."""
+
+    def __init__(self, endpoint):
+        self.scope = {"type": "http", "method": "POST", "path": "/auth/login", "route": SimpleNamespace(path="/auth/login")}
+        self.endpoint = endpoint
+
+    async def run_asgi(self):
+        await self.endpoint(self.scope, None, None)
+
+async def run(watchdog: LoopWatchdog, endpoint):
+    watchdog.start(asyncio.get_running_loop())
+    try:
+        await asyncio.sleep(0.05)
+        await asyncio.create_task(RequestCycle(endpoint).run_asgi())
+        await asyncio.sleep(0.05)  # the next heartbeat closes the stall
+    finally:
+        watchdog.stop()
+
+@pytest.mark.parametrize("endpoint", [login_endpoint, run_sync_endpoint])
+def test_stall_is_recorded_with_route_and_stack(endpoint):
+    watchdog = LoopWatchdog(threshold_ms=50, history=10)
+    asyncio.run(run(watchdog, endpoint))
+
+    [stall] = watchdog.stalls()
+    assert (stall["method"], stall["route"]) == ("POST", "/auth/login")
+    assert stall["ended"]
+    assert 150 <= stall["duration_ms"] < 400
+    assert "in block_the_loop: time.sleep(0.2)" in stall["stack"][-1]
+    assert not watchdog.running
+
+async def run_idle(watchdog: LoopWatchdog):
+    watchdog.start(asyncio.get_running_loop())
+    await asyncio.sleep(0.2)
+    watchdog.stop()
+
+def test_idle_loop_records_nothing():
+    watchdog = LoopWatchdog(threshold_ms=50, history=10)
+    asyncio.run(run_idle(watchdog))
+    assert watchdog.stalls() == []
@@ -0,0 +1,69 @@
+import multiprocessing
+import threading
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.core.metrics import MetricsRegistry
+from app.db.models import Service
+
+# Using fixtures from conftest.py
+
+def test_counters_from_all_threads_are_summed():
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests", ("route",))
+    workers = [threading.Thread(target=lambda: [requests.inc("/a") for _ in range(1000)]) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    requests.inc("/b", amount=2)
+
+    text = registry.render()
+    assert 'test_requests_total{route="/a"} 4000' in text
+    assert 'test_requests_total{route="/b"} 2' in text
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_latency_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        latency.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{le="1.0"} 3' in lines
+    assert 'test_latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert "test_latency_seconds_sum 4.25" in lines
+    assert "test_latency_seconds_count 4" in lines
+
+def _worker(directory: str):
+    registry = MetricsRegistry(directory)
+    registry.counter("test_jobs_total", "Jobs", ("kind",)).inc("email", amount=2)
+
+def test_multiprocess_mode_sums_every_worker(tmp_path):
+    registry = MetricsRegistry(str(tmp_path))
+    jobs = registry.counter("test_jobs_total", "Jobs", ("kind",))
+    jobs.inc("email")
+
+    worker = multiprocessing.get_context("spawn").Process(target=_worker, args=(str(tmp_path),))
+    worker.start()
+    worker.join(timeout=60)
+
+    assert worker.exitcode == 0
+    assert len(list(tmp_path.glob("metrics_*.db"))) == 2
+    assert 'test_jobs_total{kind="email"} 3' in registry.render()
+
+def test_metrics_endpoint_reports_route_templates(client: TestClient, db: Session):
+    service = Service(name="Metrics Service", description="Scraped", price=10.0, duration_minutes=30)
+    db.add(service)
+    db.commit()
+    client.get(f"/services/{service.id}")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert 'bookit_http_requests_total{method="GET",route="/services/{service_id}",status="200"}' in text
+    assert 'bookit_http_request_duration_seconds_bucket{method="GET",route="/services/{service_id}",le="+Inf"}' in text
+    assert 'bookit_db_queries_total{route="/services/{service_id}"}' in text
+    assert 'bookit_cache_lookups_total{cache="service_details",result="miss"}' in text
+    assert "bookit_http_requests_in_flight 1" in text  # the scrape itself
@@ -0,0 +1,71 @@
+import threading
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.core.profiling import RequestProfile, find_profile
+from app.db.models import User
+from app.services.auth import access_token_claims, create_access_token
+
+# Using fixtures from conftest.py
+
+def spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(100))
+
+def test_profile_samples_bound_threads_only():
+    profile = RequestProfile("GET", "/spin", interval=0.001)
+    stop, unbound = threading.Event(), threading.Event()
+    other = threading.Thread(target=spin, args=(unbound,))
+    other.start()
+    profile.start()
+    try:
+        worker = threading.Thread(target=profile.bind(spin), args=(stop,))
+        worker.start()
+        threading.Event().wait(0.05)
+        stop.set()
+        worker.join()
+    finally:
+        profile.stop()
+        unbound.set()
+        other.join()
+
+    assert profile.stacks
+    for line in profile.collapsed().splitlines():
+        frames, count = line.rsplit(" ", 1)
+        assert frames.startswith("spin (app/tests/test_profiling.py:")
+        assert int(count) > 0
+
+def admin_headers(db: Session) -> dict:
+    admin = User(name="Profiling Admin", email="profiling-admin@example.com", hashed_password="x", role="admin")
+    db.add(admin)
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token(data=access_token_claims(admin))}"}
+
+def test_admin_profiles_a_request(client: TestClient, db: Session):
+    headers = admin_headers(db)
+
+    response = client.get("/bookings/", headers={**headers, "X-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert find_profile(profile_id).status_code == 200
+
+    listing = client.get("/admin/profiles", headers=headers).json()
+    assert listing[0]["id"] == profile_id
+    assert listing[0]["path"] == "/bookings/"
+    profile = client.get(f"/admin/profiles/{profile_id}", headers=headers)
+    assert profile.status_code == 200
+    assert profile.headers["content-type"].startswith("text/plain")
+    assert client.get("/admin/profiles/unknown", headers=headers).status_code == 404
+
+    assert "X-Profile-Id" not in client.get("/bookings/", headers=headers).headers
+
+def test_profile_flag_ignored_for_non_admins(client: TestClient, db: Session):
+    response = client.get("/services/", headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    user = User(name="Profiled User", email="profiled-user@example.com", hashed_password="x", role="customer")
+    db.add(user)
+    db.commit()
+    token = create_access_token(data=access_token_claims(user))
+    response = client.get("/services/", headers={"Authorization": f"Bearer {token}", "X-Profile": "1"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
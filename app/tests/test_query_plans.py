@@ -0,0 +1,148 @@
+import os
+import pytest
+from sqlalchemy import text
+
+# Seeding a million bookings takes a while, so these checks are opt-in:
+#   BOOKIT_EXPLAIN_TESTS=1 pytest app/tests/test_query_plans.py
+# They need a database migrated to head (alembic upgrade head).
+pytestmark = pytest.mark.skipif(
+    not os.getenv("BOOKIT_EXPLAIN_TESTS"),
+    reason="set BOOKIT_EXPLAIN_TESTS=1 to run the EXPLAIN index checks",
+)
+
+SERVICES = 10_000
+USERS = 1_000
+BOOKINGS = 1_000_000
+
+SEED_SQL = [
+    f"""
+    INSERT INTO users (id, name, email, hashed_password, role, created_at)
+    SELECT gen_random_uuid(), 'Explain User ' || g, 'explain-' || g || '@example.com', 'x', 'user', now()
+    FROM generate_series(1, {USERS}) g
+    """,
+    f"""
+    INSERT INTO services (id, name, description, price, duration_minutes, is_active, created_at)
+    SELECT gen_random_uuid(), 'explain-service ' || g, 'Seeded service', 50, 60, true, now()
+    FROM generate_series(1, {SERVICES}) g
+    """,
+    # Bookings of a service are laid out back to back, so active ones never overlap
+    f"""
+    WITH s AS (SELECT array_agg(id) AS ids FROM services WHERE name LIKE 'explain-service %'),
+         u AS (SELECT array_agg(id) AS ids FROM users WHERE email LIKE 'explain-%')
+    INSERT INTO bookings (id, user_id, service_id, start_time, end_time, status, created_at)
+    SELECT gen_random_uuid(),
+           u.ids[1 + g % {USERS}],
+           s.ids[1 + g % {SERVICES}],
+           timestamp '2024-01-01' + (g / {SERVICES}) * interval '2 hours',
+           timestamp '2024-01-01' + (g / {SERVICES}) * interval '2 hours' + interval '1 hour',
+           (ARRAY['pending', 'confirmed', 'cancelled', 'completed'])[1 + (g / 7) % 4],
+           now()
+    FROM generate_series(0, {BOOKINGS - 1}) g, s, u
+    """,
+    """
+    INSERT INTO reviews (id, booking_id, user_id, rating, comment, created_at)
+    SELECT gen_random_uuid(), b.id, b.user_id, 1 + (abs(hashtext(b.id::text)) % 5), NULL, now()
+    FROM bookings b
+    WHERE b.status = 'completed'
+    """,
+    "ANALYZE users",
+    "ANALYZE services",
+    "ANALYZE bookings",
+    "ANALYZE reviews",
+]
+
+
+@pytest.fixture(scope="module")
+def seeded(db_engine):
+    connection = db_engine.connect()
+    transaction = connection.begin()
+    for statement in SEED_SQL:
+        connection.execute(text(statement))
+    service_id = connection.execute(
+        text("SELECT id FROM services WHERE name = 'explain-service 42'")
+    ).scalar()
+    user_id = connection.execute(
+        text("SELECT id FROM users WHERE email = 'explain-42@example.com'")
+    ).scalar()
+    booking_id = connection.execute(
+        text("SELECT booking_id FROM reviews JOIN bookings ON bookings.id = reviews.booking_id "
+             "WHERE bookings.service_id = :service_id LIMIT 1"),
+        {"service_id": service_id},
+    ).scalar()
+
+    yield connection, {"service_id": service_id, "user_id": user_id, "booking_id": booking_id}
+
+    transaction.rollback()
+    connection.close()
+
+
+def index_names(connection, sql, params):
+    """Return the names of all indexes referenced by the plan of `sql`."""
+    plan = connection.execute(text("EXPLAIN (FORMAT JSON) " + sql), params).scalar()
+    names = set()
+    nodes = [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if "Index Name" in node:
+            names.add(node["Index Name"])
+        nodes.extend(node.get("Plans", []))
+    return names
+
+
+HOT_QUERIES = {
+    "ix_bookings_service_active_window": (
+        """
+        SELECT id FROM bookings
+        WHERE service_id = :service_id
+          AND status IN ('pending', 'confirmed')
+          AND start_time < timestamp '2024-01-03 12:00'
+          AND end_time > timestamp '2024-01-03 11:00'
+        LIMIT 1
+        """,
+        lambda ids: {"service_id": ids["service_id"]},
+    ),
+    "ix_bookings_user_start": (
+        "SELECT * FROM bookings WHERE user_id = :user_id ORDER BY start_time LIMIT 50",
+        lambda ids: {"user_id": ids["user_id"]},
+    ),
+    "ix_bookings_status_start": (
+        """
+        SELECT * FROM bookings
+        WHERE status = 'completed'
+          AND start_time >= timestamp '2024-01-04'
+          AND end_time <= timestamp '2024-01-05'
+        ORDER BY start_time
+        LIMIT 50
+        """,
+        lambda ids: {},
+    ),
+    "ix_reviews_booking_id": (
+        """
+        SELECT reviews.* FROM reviews
+        JOIN bookings ON bookings.id = reviews.booking_id
+        WHERE bookings.service_id = :service_id
+        """,
+        lambda ids: {"service_id": ids["service_id"]},
+    ),
+    "ix_reviews_user_id": (
+        "SELECT * FROM reviews WHERE user_id = :user_id",
+        lambda ids: {"user_id": ids["user_id"]},
+    ),
+}
+
+
+@pytest.mark.parametrize("index_name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(seeded, index_name):
+    connection, ids = seeded
+    sql, params = HOT_QUERIES[index_name]
+    assert index_name in index_names(connection, sql, params(ids))
+
+
+def test_review_exists_check_uses_unique_index(seeded):
+    connection, ids = seeded
+    names = index_names(
+        connection,
+        "SELECT id FROM reviews WHERE booking_id = :booking_id LIMIT 1",
+        {"booking_id": ids["booking_id"]},
+    )
+    assert "ix_reviews_booking_id" in names
@@ -0,0 +1,62 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.db.models import Service, User
+from app.db.query_stats import track_queries
+from app.services.auth import create_access_token, hash_password
+
+# Using fixtures from conftest.py
+
+@pytest.fixture
+def service(db: Session):
+    service = Service(name="Budget Service", description="Query budget", price=40.0, duration_minutes=60)
+    db.add(service)
+    db.commit()
+    return service
+
+@pytest.fixture
+def auth_headers(db: Session):
+    user = User(name="Budget User", email="budget@example.com", hashed_password=hash_password("securepassword123"), role="customer")
+    db.add(user)
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+
+def test_repeated_statements_are_flagged(db: Session, service: Service):
+    service_id = service.id
+    with track_queries() as queries:
+        for _ in range(5):
+            db.execute(select(Service.name).where(Service.id == service_id)).all()
+        db.execute(select(Service.price)).all()
+
+    assert queries.count == 6
+    assert queries.duration_ms > 0
+    [repeated] = queries.repeated(5)
+    assert repeated["count"] == 5
+    assert repeated["statement"].startswith("SELECT services.name")
+
+def test_server_timing_reports_request_queries(client: TestClient, service: Service):
+    response = client.get(f"/services/{service.id}")
+
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert response.headers["Server-Timing"].endswith('desc="1 queries"')
+
+def test_query_budget_fails_when_exceeded(client: TestClient, service: Service, assert_max_queries):
+    with pytest.raises(AssertionError, match="budget 0"):
+        with assert_max_queries(0):
+            client.get("/services/", params={"active": True})
+
+def test_booking_endpoints_query_budget(client: TestClient, service: Service, auth_headers, assert_max_queries):
+    start = datetime.now() + timedelta(days=3)
+    payload = {"service_id": str(service.id), "start_time": start.isoformat(), "end_time": (start + timedelta(hours=1)).isoformat()}
+
+    # The first authenticated request also syncs the revocation store
+    client.get("/bookings/me", headers=auth_headers)
+
+    # service lookup, insert, refresh, re-select with the service (the user snapshot is cached)
+    with assert_max_queries(4):
+        assert client.post("/bookings/", json=payload, headers=auth_headers).status_code == 201
+    with assert_max_queries(1):
+        assert client.get("/bookings/me", headers=auth_headers).status_code == 200
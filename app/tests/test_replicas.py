@@ -0,0 +1,123 @@
+import os
+import time
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+from app.db import session as db_session
+from app.db.replicas import READ_YOUR_WRITES_COOKIE, ReplicaSet, ReadYourWritesMiddleware, wants_primary
+
+def make_request(cookies: dict | None = None, token: str | None = None) -> Request:
+    cookie = "; ".join(f"{name}={value}" for name, value in (cookies or {}).items())
+    headers = [(b"cookie", cookie.encode())]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+def open_read_session(request: Request):
+    dependency = db_session.get_sync_read_db(request)
+    return dependency, next(dependency)
+
+def unreachable_factory():
+    # Nothing listens on port 1, so the first checkout fails
+    return sessionmaker(bind=create_engine("postgresql://bookit@127.0.0.1:1/bookit", pool_pre_ping=False))
+
+def test_replica_set_round_robin_skips_failed_replicas():
+    replicas = ReplicaSet(["a", "b", "c"], [None, None, None], retry_after=60)
+
+    assert [replicas.candidates()[0] for _ in range(4)] == [0, 1, 2, 0]
+
+    replicas.mark_down(2)
+    assert replicas.candidates() == [1, 0]
+    assert [entry["healthy"] for entry in replicas.stats()] == [True, True, False]
+
+    replicas.retry_after = 0
+    replicas.mark_down(2)
+    assert 2 in replicas.candidates()
+
+def test_read_db_falls_back_to_primary(monkeypatch):
+    replicas = ReplicaSet(["down"], [unreachable_factory()], retry_after=60)
+    monkeypatch.setattr(db_session, "replicas", replicas)
+
+    dependency, db = open_read_session(make_request())
+    try:
+        assert db.get_bind() is db_session.engine
+        assert replicas.stats()[0]["failures"] == 1
+        assert replicas.candidates() == []
+    finally:
+        dependency.close()
+
+def test_read_db_sticks_to_primary_after_a_write(monkeypatch):
+    def must_not_open():
+        raise AssertionError("replica used inside the read-your-writes window")
+
+    monkeypatch.setattr(db_session, "replicas", ReplicaSet(["replica"], [must_not_open], retry_after=60))
+
+    dependency, db = open_read_session(make_request({READ_YOUR_WRITES_COOKIE: time.time() + 5}))
+    try:
+        assert db.get_bind() is db_session.engine
+    finally:
+        dependency.close()
+
+def test_read_your_writes_cookie_only_after_successful_writes():
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=5)
+
+    @app.get("/thing")
+    def read_thing():
+        return {}
+
+    @app.post("/thing")
+    def write_thing(fail: bool = False):
+        if fail:
+            raise HTTPException(status_code=400)
+        return {}
+
+    with TestClient(app) as client:
+        assert READ_YOUR_WRITES_COOKIE not in client.get("/thing").cookies
+        assert READ_YOUR_WRITES_COOKIE not in client.post("/thing?fail=true").cookies
+        until = float(client.post("/thing").cookies[READ_YOUR_WRITES_COOKIE])
+
+    assert time.time() < until <= time.time() + 5
+
+def test_read_your_writes_follows_the_user_without_cookies():
+    from uuid import uuid4
+    from app.services.auth import create_access_token
+
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window_seconds=5)
+
+    @app.post("/thing")
+    def write_thing():
+        return {}
+
+    writer, other = create_access_token({"sub": str(uuid4())}), create_access_token({"sub": str(uuid4())})
+    assert not wants_primary(make_request(token=writer))
+    with TestClient(app) as client:
+        client.post("/thing", headers={"Authorization": f"Bearer {writer}"})
+
+    # A client keeping no cookie jar still reads its own write from the primary
+    assert wants_primary(make_request(token=writer))
+    assert not wants_primary(make_request(token=other))
+    assert not wants_primary(make_request(token="not-a-jwt"))
+
+# Point this at a second Postgres (e.g. a streaming replica of the test database)
+#   BOOKIT_TEST_REPLICA_URL=postgresql://... pytest app/tests/test_replicas.py
+@pytest.mark.skipif(not os.getenv("BOOKIT_TEST_REPLICA_URL"), reason="set BOOKIT_TEST_REPLICA_URL to test against a real replica")
+def test_read_db_uses_replica(monkeypatch):
+    replica_engine = create_engine(os.environ["BOOKIT_TEST_REPLICA_URL"])
+    replicas = ReplicaSet(["down", "replica"], [unreachable_factory(), sessionmaker(bind=replica_engine)], retry_after=60)
+    monkeypatch.setattr(db_session, "replicas", replicas)
+
+    try:
+        for _ in range(2):
+            dependency, db = open_read_session(make_request())
+            try:
+                assert db.get_bind() is replica_engine
+            finally:
+                dependency.close()
+        assert [entry["reads"] for entry in replicas.stats()] == [0, 2]
+    finally:
+        replica_engine.dispose()
@@ -0,0 +1,94 @@
+import json
+import logging
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.core.logging import JsonLineFormatter, RequestLoggingMiddleware, access_logger
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+@pytest.fixture
+def access_records():
+    handler = ListHandler()
+    level = access_logger.level
+    access_logger.setLevel(logging.INFO)
+    access_logger.addHandler(handler)
+    yield handler.records
+    access_logger.removeHandler(handler)
+    access_logger.setLevel(level)
+
+def make_app(sample_2xx: float, sample_queue_fill: float = 0.5) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware, sample_2xx=sample_2xx, sample_queue_fill=sample_queue_fill)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        if item_id == 0:
+            raise HTTPException(status_code=404)
+        return {"id": item_id}
+
+    return app
+
+def test_request_line_fields(access_records):
+    with TestClient(make_app(1.0)) as client:
+        response = client.get("/items/7", params={"full": "true"})
+
+    assert response.headers["Server-Timing"] == 'db;dur=0.0;desc="0 queries"'
+    [record] = access_records
+    line = json.loads(JsonLineFormatter().format(record))
+    assert line["method"] == "GET"
+    assert line["url"] == "http://testserver/items/7?full=true"
+    assert line["status_code"] == 200
+    assert line["duration_ms"] > 0
+    assert line["db_queries"] == 0
+    assert record.levelno == logging.INFO
+
+def test_sampling_only_drops_successful_requests(access_records):
+    with TestClient(make_app(0.0, sample_queue_fill=0.0)) as client:
+        client.get("/items/1")
+        client.get("/items/0")
+
+    assert [record.msg["status_code"] for record in access_records] == [404]
+
+def test_no_sampling_below_the_queue_fill(access_records):
+    with TestClient(make_app(0.0)) as client:
+        client.get("/items/1")
+
+    assert [record.msg["status_code"] for record in access_records] == [200]
+
+def test_error_after_response_start_keeps_its_status(access_records):
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/stream")
+    def stream():
+        def chunks():
+            yield b"partial"
+            raise RuntimeError("stream broke")
+        return StreamingResponse(chunks())
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        client.get("/stream")
+
+    [record] = access_records
+    assert record.msg["status_code"] == 200
+    assert "error" in record.msg
+
+def test_stop_with_a_full_queue():
+    import queue
+    from app.core.logging import DrainingQueueListener
+
+    log_queue = queue.Queue(maxsize=2)
+    listener = DrainingQueueListener(log_queue, logging.NullHandler())
+    log_queue.put_nowait(logging.makeLogRecord({}))
+    log_queue.put_nowait(logging.makeLogRecord({}))
+    listener.start()
+    listener.stop()
+    assert log_queue.empty()
@@ -191,4 +191,66 @@ def test_delete_review_by_admin(authenticated_client: TestClient, admin_user: Us
         if original_dependency:
             app.dependency_overrides[get_current_user] = original_dependency
         else:
-            del app.dependency_overrides[get_current_user]
\ No newline at end of file
+            del app.dependency_overrides[get_current_user]
+
+def test_review_writes_maintain_service_rating(
+    authenticated_client: TestClient, db: Session, service: Service, completed_booking: Booking
+):
+    response = authenticated_client.post(
+        "/reviews/",
+        json={"booking_id": str(completed_booking.id), "rating": 4, "comment": "Good"}
+    )
+    assert response.status_code == 201
+    review_id = response.json()["id"]
+    
+    listed = authenticated_client.get(f"/services/{service.id}").json()
+    assert listed["rating_count"] == 1
+    assert listed["rating_average"] == 4.0
+    assert listed["rating_histogram"] == [0, 0, 0, 1, 0]
+    
+    authenticated_client.patch(f"/reviews/{review_id}", json={"rating": 2})
+    listed = authenticated_client.get(f"/services/{service.id}").json()
+    assert listed["rating_average"] == 2.0
+    assert listed["rating_histogram"] == [0, 1, 0, 0, 0]
+    
+    rated = authenticated_client.get("/services/", params={"sort": "rating", "min_rating": 2}).json()
+    assert str(service.id) in [s["id"] for s in rated]
+    averages = [s["rating_average"] for s in rated]
+    assert averages == sorted(averages, reverse=True)
+    
+    from app.repositories.review_repo import reconcile_service_ratings
+    assert reconcile_service_ratings(db) == 0
+
+def test_service_reviews_keyset_pages(client: TestClient, db: Session, user: User, service: Service):
+    from app.db.models import Review
+    
+    start = datetime(2024, 1, 1, 9, 0)
+    for i, rating in enumerate([3, 5, 1, 4, 2]):
+        booking = Booking(
+            user_id=user.id,
+            service_id=service.id,
+            start_time=start + timedelta(days=i),
+            end_time=start + timedelta(days=i, hours=1),
+            status="completed"
+        )
+        db.add(booking)
+        db.flush()
+        db.add(Review(booking_id=booking.id, user_id=user.id, rating=rating, created_at=start + timedelta(days=i)))
+    db.commit()
+    
+    first = client.get(f"/services/{service.id}/reviews", params={"limit": 2}).json()
+    assert first["service"]["id"] == str(service.id)
+    assert [r["rating"] for r in first["items"]] == [2, 4]
+    assert "service" not in first["items"][0]
+    assert client.get(f"/reviews/service/{service.id}/reviews", params={"limit": 2}).json() == first
+    rest = client.get(f"/services/{service.id}/reviews", params={"limit": 10, "cursor": first["next_cursor"]}).json()
+    assert [r["rating"] for r in rest["items"]] == [1, 5, 3]
+    assert rest["next_cursor"] is None
+    
+    by_rating = client.get(f"/services/{service.id}/reviews", params={"limit": 3, "sort": "rating"}).json()
+    assert [r["rating"] for r in by_rating["items"]] == [5, 4, 3]
+    rest = client.get(
+        f"/services/{service.id}/reviews",
+        params={"limit": 3, "sort": "rating", "cursor": by_rating["next_cursor"]}
+    ).json()
+    assert [r["rating"] for r in rest["items"]] == [2, 1]
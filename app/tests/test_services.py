@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.db.models import Service
+
+# Using fixtures from conftest.py
+
+@pytest.fixture
+def services(db: Session):
+    services = [
+        Service(name="Deep Tissue Massage", description="Relaxing full body massage", price=80.0, duration_minutes=60),
+        Service(name="Yoga Class", description="Morning yoga for beginners", price=20.0, duration_minutes=45),
+        Service(name="Bike Repair", description="Tune-ups and flat tyres", price=35.0, duration_minutes=30),
+    ]
+    db.add_all(services)
+    db.commit()
+    return services
+
+def test_search_services_full_text(client: TestClient, services):
+    response = client.get("/services/", params={"q": "massages"})
+    assert response.status_code == 200
+    names = [service["name"] for service in response.json()]
+    assert names[0] == "Deep Tissue Massage"
+    assert "Bike Repair" not in names
+
+def test_search_services_partial_term(client: TestClient, services):
+    response = client.get("/services/", params={"q": "Yog"})
+    assert response.status_code == 200
+    assert "Yoga Class" in [service["name"] for service in response.json()]
+
+def test_service_list_cache_invalidated_on_create(client: TestClient, services):
+    from app.main import app
+    from app.db.models import User
+    from app.services.security import require_admin
+    
+    assert len(client.get("/services/", params={"active": True}).json()) >= 3
+    cached = client.get("/services/", params={"active": True}).json()
+    
+    app.dependency_overrides[require_admin] = lambda: User(name="Admin", email="cache-admin@example.com", role="admin")
+    try:
+        response = client.post(
+            "/services/",
+            json={"name": "Guitar Lesson", "description": "One to one", "price": 40.0, "duration_minutes": 60}
+        )
+    finally:
+        del app.dependency_overrides[require_admin]
+    assert response.status_code == 201
+    
+    listed = client.get("/services/", params={"active": True}).json()
+    assert len(listed) == len(cached) + 1
+    assert client.get(f"/services/{response.json()['id']}").json()["name"] == "Guitar Lesson"
+
+def test_service_list_read_racing_a_write_is_not_cached(client: TestClient, services, monkeypatch):
+    from app.services import book_service
+    
+    get_services = book_service.get_services
+    
+    def get_services_then_write(*args):
+        stale = get_services(*args)
+        book_service.invalidate_service_cache()  # a write lands before the payload is cached
+        return stale
+    
+    monkeypatch.setattr(book_service, "get_services", get_services_then_write)
+    client.get("/services/", params={"price_min": 1})
+    assert len(book_service._list_cache) == 0
@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db import slow_queries
+from app.db.slow_queries import SlowQueryLog, normalize
+
+def test_normalize_collapses_literals_and_parameters():
+    first = normalize("SELECT * FROM services WHERE price > 20 AND name = 'Yoga'  AND id IN (%(id_1)s, %(id_2)s)")
+    second = normalize("SELECT * FROM services\n WHERE price > 35.5 AND name = 'It''s' AND id IN (%(id_1)s)")
+
+    assert first == second == "SELECT * FROM services WHERE price > ? AND name = ? AND id IN (...)"
+    assert normalize("SELECT rating_1 FROM services LIMIT $1") == "SELECT rating_1 FROM services LIMIT ?"
+
+def test_table_keeps_top_fingerprints_by_total_time():
+    log = SlowQueryLog(threshold_ms=10, top_n=2, explain=False)
+    log.observe("SELECT 1 FROM a", None, 5, "psycopg2")  # under the threshold
+    log.observe("SELECT 1 FROM a", None, 30, "psycopg2")
+    log.observe("SELECT 2 FROM a", None, 30, "psycopg2")  # same fingerprint
+    log.observe("SELECT 1 FROM b", None, 20, "psycopg2")
+    log.observe("SELECT 1 FROM c", None, 15, "psycopg2")  # slower than nothing in the table
+    log.observe("SELECT 1 FROM d", None, 25, "psycopg2")  # replaces b
+
+    entries = log.entries()
+    assert [(entry["statement"], entry["calls"], entry["total_ms"]) for entry in entries] == [
+        ("SELECT ? FROM a", 2, 60.0),
+        ("SELECT ? FROM d", 1, 25.0),
+    ]
+    assert log.dropped == 1
+
+def test_slow_statement_plan_is_captured_once(db: Session, monkeypatch):
+    log = SlowQueryLog(threshold_ms=1e-6, top_n=10, explain=True)
+    monkeypatch.setattr(slow_queries, "slow_query_log", log)
+
+    for price in (10, 20):
+        db.execute(text("SELECT name FROM services WHERE price > :price"), {"price": price}).all()
+    log.wait_for_plans(timeout=10)
+
+    [entry] = [entry for entry in log.entries() if "FROM services WHERE price" in entry["statement"]]
+    assert entry["calls"] == 2
+    assert entry["plan_error"] is None
+    assert entry["plan"][0]["Plan"]["Node Type"] == "Seq Scan"
+    assert entry["seq_scans"] == ["services"]
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.timing import current_timing, span, timed, track_timing
+from app.db.models import Service, User
+from app.services.auth import create_access_token, hash_password
+
+# Using fixtures from conftest.py
+
+@timed("lookup")
+def lookup(depth: int = 0):
+    if depth:
+        lookup(depth - 1)  # nested calls count once
+    return "found"
+
+@timed("fetch")
+async def fetch():
+    await asyncio.sleep(0)
+    return "fetched"
+
+def test_spans_are_noops_outside_a_timed_request():
+    assert current_timing() is None
+    with span("anything"):
+        pass
+    assert lookup() == "found"
+
+def test_spans_accumulate_per_name():
+    with track_timing() as timing:
+        lookup(depth=2)
+        lookup()
+        assert asyncio.run(fetch()) == "fetched"
+        with span("block"):
+            pass
+
+    assert list(timing.spans) == ["lookup", "fetch", "block"]
+    assert timing.spans["lookup"][1] == 2
+    assert timing.server_timing().startswith("lookup;dur=")
+    assert current_timing() is None
+
+def test_booking_request_breakdown(client: TestClient, db: Session, monkeypatch):
+    monkeypatch.setattr(settings, "server_timing", True)
+    user = User(name="Timing User", email="timing@example.com", hashed_password=hash_password("securepassword123"), role="customer")
+    service = Service(name="Timing Service", description="Spans", price=40.0, duration_minutes=60)
+    db.add_all([user, service])
+    db.commit()
+    start = datetime.now() + timedelta(days=4)
+
+    response = client.post(
+        "/bookings/",
+        json={"service_id": str(service.id), "start_time": start.isoformat(), "end_time": (start + timedelta(hours=1)).isoformat()},
+        headers={"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"},
+    )
+
+    assert response.status_code == 201
+    names = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+    assert names == [
+        "db", "auth", "booking_service", "booking_precheck", "booking_insert",
+        "booking_reload", "booking_serialize", "endpoint", "response",
+    ]
+
+def test_server_timing_off_by_default(client: TestClient):
+    assert client.get("/services/").headers["Server-Timing"].startswith("db;")
+    assert "endpoint" not in client.get("/services/").headers["Server-Timing"]
@@ -0,0 +1,83 @@
+"""
+Authenticated request benchmark for BookIt API
+Calls GET /me in-process with a bearer token, once with the user snapshot
+cache disabled and once enabled, and reports latency, SQL statements per
+request and the cache hit ratio. Runs inside a transaction that is rolled
+back at the end; needs DATABASE_URL pointing at a migrated database.
+
+    python scripts/bench_auth_cache.py --requests 2000
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import User
+from app.db.session import engine, get_db
+from app.main import app
+from app.services import auth
+
+
+def run(client, headers, requests, counter):
+    timings = []
+    counter["statements"] = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get("/me", headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return statistics.median(timings), counter["statements"] / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = sessionmaker(bind=connection)()
+    user = User(name="Bench User", email="bench-auth@example.com", hashed_password="x", role="user")
+    db.add(user)
+    db.flush()
+
+    counter = {"statements": 0}
+
+    @event.listens_for(connection, "before_cursor_execute")
+    def count(*_):
+        counter["statements"] += 1
+
+    app.dependency_overrides[get_db] = lambda: db
+    headers = {"Authorization": f"Bearer {auth.create_access_token(data={'sub': str(user.id)})}"}
+    cache = auth._user_cache
+    try:
+        with TestClient(app) as client:
+            maxsize = cache.maxsize
+            cache.maxsize = 0  # every set() is evicted immediately
+            latency, queries = run(client, headers, args.requests, counter)
+            print(f"cache off: median={latency:.3f}ms queries/request={queries:.2f}")
+
+            cache.maxsize = maxsize
+            cache.clear()
+            cache.hits = cache.misses = 0
+            latency, queries = run(client, headers, args.requests, counter)
+            print(
+                f"cache on:  median={latency:.3f}ms queries/request={queries:.2f} "
+                f"hit_ratio={cache.stats()['hit_ratio']:.3f}"
+            )
+    finally:
+        app.dependency_overrides.clear()
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
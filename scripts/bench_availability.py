@@ -0,0 +1,63 @@
+"""
+Availability sweep benchmark for BookIt API
+Times compute_free_slots over a month-long window for a busy service
+(every hour of every day booked except a few gaps). Pure CPU: no database
+needed, but DATABASE_URL/JWT_SECRET must be set so app settings load.
+
+    python scripts/bench_availability.py
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.availability import compute_free_slots
+
+
+def busy_month(start, days, duration, free_ratio, seed=42):
+    """Back-to-back bookings of `duration` with roughly `free_ratio` of slots left open."""
+    rng = random.Random(seed)
+    busy = []
+    cursor = start
+    end = start + timedelta(days=days)
+    while cursor < end:
+        if rng.random() >= free_ratio:
+            busy.append((cursor, cursor + duration))
+        cursor += duration
+    return busy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--duration", type=int, default=30, help="service duration in minutes")
+    parser.add_argument("--granularity", type=int, default=15, help="slot grid in minutes")
+    parser.add_argument("--free-ratio", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    start = datetime(2026, 1, 1)
+    duration = timedelta(minutes=args.duration)
+    step = timedelta(minutes=args.granularity)
+    busy = busy_month(start, args.days, duration, args.free_ratio)
+    window_end = start + timedelta(days=args.days)
+
+    timings = []
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        slots = compute_free_slots(busy, start, window_end, duration, step)
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    print(
+        f"{len(busy)} bookings over {args.days} days -> {len(slots)} open slots: "
+        f"median={statistics.median(timings):.2f}ms max={max(timings):.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
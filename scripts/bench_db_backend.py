@@ -0,0 +1,86 @@
+"""
+Database backend benchmark for BookIt API
+Drives GET /services/{id}/availability (uncached, one service lookup plus
+one bookings query per request) in-process with many concurrent clients,
+once per DB_BACKEND, and prints requests per second for a single worker.
+Each backend runs in its own subprocess because the engine is chosen at
+import time. Needs DATABASE_URL pointing at a migrated database; the
+service it creates is deleted at the end.
+
+    python scripts/bench_db_backend.py --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BACKENDS = ("sync", "async")
+
+
+async def drive(app, service_id, requests, concurrency):
+    import httpx
+
+    window_start = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    params = {"from": window_start.isoformat(), "to": (window_start + timedelta(days=1)).isoformat()}
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one(client):
+        nonlocal failures
+        async with semaphore:
+            response = await client.get(f"/services/{service_id}/availability", params=params)
+            failures += response.status_code != 200
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        await one(client)  # warm up the pool
+        start = time.perf_counter()
+        await asyncio.gather(*(one(client) for _ in range(requests)))
+        return requests / (time.perf_counter() - start), failures
+
+
+def run_backend(args):
+    from app.db.models import Service
+    from app.db.session import SessionLocal
+    from app.main import app
+
+    with SessionLocal() as db:
+        service = Service(name="Backend bench", description="bench", price=1, duration_minutes=30)
+        db.add(service)
+        db.commit()
+        service_id = service.id
+    try:
+        rate, failures = asyncio.run(drive(app, service_id, args.requests, args.concurrency))
+        print(f"{os.environ['DB_BACKEND']:>5}: {rate:8.1f} req/s ({failures} failed)")
+    finally:
+        with SessionLocal() as db:
+            db.query(Service).filter(Service.id == service_id).delete()
+            db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--backend", choices=BACKENDS, help="run a single backend in this process")
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args)
+        return
+    for backend in BACKENDS:
+        subprocess.run(
+            [sys.executable, __file__, "--backend", backend,
+             "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+            env={**os.environ, "DB_BACKEND": backend},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Login storm benchmark for BookIt API
+Measures latency of an unrelated endpoint (GET /services/) while many
+concurrent logins run against the same server. Run it against the code
+before and after a change to compare the p99.
+
+    python scripts/bench_login_storm.py --base-url http://localhost:8080 \
+        --email admin@bookit.com --password admin123456
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def login_storm(client, args, stop):
+    """Keep `args.logins` concurrent logins in flight until stopped."""
+    async def worker():
+        while not stop.is_set():
+            await client.post(
+                "/auth/login",
+                data={"username": args.email, "password": args.password},
+            )
+
+    await asyncio.gather(*(worker() for _ in range(args.logins)))
+
+
+async def probe(client, args):
+    """Issue sequential GET /services/ requests and record their latency in ms."""
+    samples = []
+    for _ in range(args.requests):
+        start = time.perf_counter()
+        await client.get("/services/")
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def run(args):
+    limits = httpx.Limits(max_connections=args.logins + 4)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        baseline = await probe(client, args)
+
+        stop = asyncio.Event()
+        storm = asyncio.create_task(login_storm(client, args, stop))
+        await asyncio.sleep(1)  # let the storm ramp up
+        loaded = await probe(client, args)
+        stop.set()
+        await storm
+
+    for label, samples in (("idle", baseline), ("login storm", loaded)):
+        print(
+            f"GET /services/ ({label}): "
+            f"p50={statistics.median(samples):.1f}ms "
+            f"p99={percentile(samples, 99):.1f}ms "
+            f"max={max(samples):.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--email", default="admin@bookit.com")
+    parser.add_argument("--password", default="admin123456")
+    parser.add_argument("--logins", type=int, default=32, help="concurrent logins in flight")
+    parser.add_argument("--requests", type=int, default=200, help="probe requests per phase")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
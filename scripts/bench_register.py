@@ -0,0 +1,88 @@
+"""
+Registration load test for BookIt API
+Fires concurrent POST /auth/register requests in-process (some of them
+reusing an email, to exercise the duplicate path) and reports throughput,
+latency percentiles and SQL round trips per registration. Needs
+DATABASE_URL pointing at a migrated database; the users it creates are
+deleted at the end.
+
+    python scripts/bench_register.py --users 1000 --concurrency 100
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from sqlalchemy import event, text
+
+from app.db.session import engine
+from app.main import app
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args, prefix):
+    emails = [f"{prefix}-{i % args.unique}@example.com" for i in range(args.users)]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    samples, statuses = [], {}
+
+    async def register(client, email):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(
+                "/auth/register",
+                json={"name": "Load Test", "email": email, "password": "loadtestpassword"},
+            )
+            samples.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(register(client, email) for email in emails))
+        elapsed = time.perf_counter() - start
+    return samples, statuses, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000, help="registration requests to send")
+    parser.add_argument("--unique", type=int, default=900, help="distinct emails among them")
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    statements = {"count": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        statements["count"] += 1
+
+    prefix = f"bench-register-{uuid4().hex[:8]}"
+    try:
+        samples, statuses, elapsed = asyncio.run(run(args, prefix))
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text("DELETE FROM users WHERE email LIKE :pattern"), {"pattern": f"{prefix}-%"})
+
+    print(f"{args.users} registrations ({args.unique} distinct emails), concurrency {args.concurrency}")
+    print(f"  statuses: {dict(sorted(statuses.items()))}")
+    print(f"  throughput: {args.users / elapsed:.1f} req/s")
+    print(
+        f"  latency: p50={statistics.median(samples):.1f}ms "
+        f"p95={percentile(samples, 95):.1f}ms p99={percentile(samples, 99):.1f}ms"
+    )
+    # The cleanup DELETE is excluded
+    print(f"  SQL statements per registration: {(statements['count'] - 1) / args.users:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Request logging overhead benchmark for BookIt API
+Drives a bare FastAPI app (one GET endpoint, no database) through its ASGI
+interface and reports the time per request with no logging middleware,
+with the previous BaseHTTPMiddleware-based log_requests, and with
+RequestLoggingMiddleware (also sampling 10% of 2xx lines at any load). Log lines go to
+/dev/null so terminal speed does not skew the numbers. Needs the usual
+DATABASE_URL/JWT_SECRET environment for the settings module, but never
+connects.
+
+    python scripts/bench_request_logging.py --requests 20000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Request
+
+from app.core import logging as request_logging
+from app.core.logging import RequestLoggingMiddleware
+
+legacy_logger = logging.getLogger("bench.legacy")
+
+
+async def legacy_log_requests(request: Request, call_next):
+    # app.core.logging.log_requests as it was before the pure ASGI middleware
+    log_data = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "method": request.method,
+        "url": str(request.url),
+        "client": request.client.host if request.client else "unknown",
+    }
+    start_time = datetime.now(timezone.utc)
+    response = await call_next(request)
+    duration = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
+    log_data["status_code"] = response.status_code
+    log_data["duration_ms"] = duration
+    legacy_logger.info(json.dumps(log_data))
+    return response
+
+
+def make_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    if variant == "legacy":
+        app.middleware("http")(legacy_log_requests)
+    elif variant == "asgi":
+        app.add_middleware(RequestLoggingMiddleware)
+    elif variant == "asgi-sampled":
+        app.add_middleware(RequestLoggingMiddleware, sample_2xx=0.1, sample_queue_fill=0.0)
+    return app
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/ping",
+    "raw_path": b"/ping",
+    "query_string": b"",
+    "root_path": "",
+    "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("bench", 80),
+}
+
+
+async def call(app) -> None:
+    messages = [{"type": "http.disconnect"}, {"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        # BaseHTTPMiddleware listens for the disconnect that follows the response
+        return messages.pop() if len(messages) > 1 else messages[0]
+
+    async def send(message):
+        pass
+
+    await app(dict(SCOPE), receive, send)
+
+
+async def run(app, requests: int, rounds: int) -> float:
+    for _ in range(200):  # warm-up builds the middleware stack
+        await call(app)
+    per_round = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await call(app)
+        per_round.append((time.perf_counter() - start) / requests * 1e6)
+    return statistics.median(per_round)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w")
+    legacy_handler = logging.StreamHandler(devnull)
+    legacy_logger.addHandler(legacy_handler)
+    legacy_logger.setLevel(logging.INFO)
+    legacy_logger.propagate = False
+    request_logging._stream_handler.setStream(devnull)
+    request_logging.start_request_logging()
+
+    try:
+        results = {}
+        for variant in ("none", "legacy", "asgi", "asgi-sampled"):
+            results[variant] = await run(make_app(variant), args.requests, args.rounds)
+            overhead = results[variant] - results["none"]
+            print(f"{variant:13} {results[variant]:7.1f}us/request  overhead={overhead:6.1f}us")
+    finally:
+        request_logging.stop_request_logging()
+        devnull.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
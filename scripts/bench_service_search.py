@@ -0,0 +1,81 @@
+"""
+Service search benchmark for BookIt API
+Seeds a large service catalog inside a transaction that is rolled back at
+the end, then times the legacy ILIKE filter against the full-text/trigram
+search of GET /services/?q= (book_service.get_services, uncached). Both
+fetch every match, as the endpoint does. Needs DATABASE_URL pointing at a
+database migrated to head.
+
+    python scripts/bench_service_search.py --services 500000
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import or_, text
+
+from app.db.models import Service
+from app.db.session import SessionLocal
+from app.services import book_service
+
+WORDS = [
+    "haircut", "massage", "yoga", "consultation", "repair", "cleaning", "tutoring",
+    "photography", "coaching", "manicure", "plumbing", "gardening", "therapy", "design",
+]
+
+SEED_SQL = """
+INSERT INTO services (id, name, description, price, duration_minutes, is_active, created_at)
+SELECT gen_random_uuid(),
+       initcap(w1.word) || ' ' || w2.word || ' ' || g,
+       'Professional ' || w2.word || ' and ' || w1.word || ' service number ' || g,
+       20 + g % 200, 30 + (g % 4) * 15, true, now()
+FROM generate_series(1, :count) g
+CROSS JOIN LATERAL (SELECT (:words)[1 + g % :nwords] AS word) w1
+CROSS JOIN LATERAL (SELECT (:words)[1 + (g / :nwords) % :nwords] AS word) w2
+"""
+
+TERMS = ["massage", "yoga therapy", "plumb", "photo", "gardening repair"]
+
+
+def legacy_search(db, q):
+    return db.query(Service).filter(
+        or_(Service.name.ilike(f"%{q}%"), Service.description.ilike(f"%{q}%"))
+    ).all()
+
+
+def time_query(search, db, q, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        search(db, q)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--services", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Seeding {args.services} services...")
+        db.execute(text(SEED_SQL), {"count": args.services, "words": WORDS, "nwords": len(WORDS)})
+        db.execute(text("ANALYZE services"))
+
+        for q in TERMS:
+            legacy = time_query(legacy_search, db, q, args.repeat)
+            search = time_query(book_service.get_services, db, q, args.repeat)
+            print(f"q={q!r:22} ilike={legacy:8.1f}ms  fts+trgm={search:8.1f}ms")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
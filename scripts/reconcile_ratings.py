@@ -0,0 +1,28 @@
+"""
+Rating aggregate reconciliation for BookIt API
+Recomputes services.rating_count/rating_sum/rating_1..rating_5 from the
+reviews table and fixes any service whose counters have drifted (e.g. after
+manual SQL edits). Safe to run at any time, for instance from a nightly cron.
+
+    python scripts/reconcile_ratings.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db.session import SessionLocal
+from app.repositories.review_repo import reconcile_service_ratings
+
+
+def main():
+    db = SessionLocal()
+    try:
+        corrected = reconcile_service_ratings(db)
+        print(f"Corrected rating aggregates of {corrected} service(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()